@@ -52,10 +52,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',  # Allow unauthenticated access
     ],
+    # Uses orjson when installed; the browsable API is only offered in DEBUG
     'DEFAULT_RENDERER_CLASSES': [
-    'rest_framework.renderers.JSONRenderer',
-    'rest_framework.renderers.BrowsableAPIRenderer',  # ← add this
-    ],
+        'pcbuilder.renderers.FastJSONRenderer',
+    ] + (['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10
 }
@@ -64,6 +64,7 @@ REST_FRAMEWORK = {
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'pcbuilder.identity_map.IdentityMapMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -100,9 +101,74 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file rather than SQLite's in-memory default, so the raw SQL
+        # layer (pcbuilder/database.py) can open the test database too
+        'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
     }
 }
 
+# Connection pool used by the raw SQL layer in pcbuilder/database.py.
+# SQLITE_POOL_SIZE caps how many idle connections each worker keeps around.
+SQLITE_POOL_SIZE = config('SQLITE_POOL_SIZE', default=5, cast=int)
+SQLITE_POOL_HEALTH_CHECK_INTERVAL = config('SQLITE_POOL_HEALTH_CHECK_INTERVAL', default=30.0, cast=float)
+
+# Applied once to every pooled connection. WAL lets catalog reads carry on
+# while a build is being written. Check the live values with
+# `python manage.py sqlite_pragmas`.
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),  # ms
+    'cache_size': config('SQLITE_CACHE_SIZE', default=-20000, cast=int),  # negative = KiB
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=268435456, cast=int),  # bytes
+    'temp_store': config('SQLITE_TEMP_STORE', default='MEMORY'),
+}
+
+# How often (seconds) a worker checks whether its in-memory compatibility
+# rule table is out of date
+COMPATIBILITY_RULES_CHECK_INTERVAL = config('COMPATIBILITY_RULES_CHECK_INTERVAL', default=5.0, cast=float)
+
+# Max number of components whose parsed specs are kept per worker
+SPEC_CACHE_SIZE = config('SPEC_CACHE_SIZE', default=10000, cast=int)
+
+# Answer compatibility checks from the precomputed pair table when possible.
+# Fill it with `python manage.py build_compatibility_matrix`.
+COMPATIBILITY_MATRIX_ENABLED = config('COMPATIBILITY_MATRIX_ENABLED', default=True, cast=bool)
+
+# How often (seconds) the in-memory autocomplete index checks the catalog version
+AUTOCOMPLETE_REFRESH_INTERVAL = config('AUTOCOMPLETE_REFRESH_INTERVAL', default=5.0, cast=float)
+
+# Catalog cache (pcbuilder/catalog_cache.py). CATALOG_CACHE_ALIAS optionally
+# names an entry of CACHES shared by all workers, e.g. 'catalog' below.
+CATALOG_CACHE_SIZE = config('CATALOG_CACHE_SIZE', default=1000, cast=int)
+CATALOG_CACHE_CHECK_INTERVAL = config('CATALOG_CACHE_CHECK_INTERVAL', default=5.0, cast=float)
+CATALOG_CACHE_ALIAS = config('CATALOG_CACHE_ALIAS', default='')
+CATALOG_CACHE_TIMEOUT = config('CATALOG_CACHE_TIMEOUT', default=3600, cast=int)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CATALOG_CACHE_LOCATION', default=str(BASE_DIR / '.cache' / 'catalog')),
+    },
+}
+
+# Seconds an authenticated user is cached per worker (0 disables). Every
+# worker drops its cached users within AUTH_USER_CACHE_CHECK_INTERVAL seconds
+# of a user being changed or deactivated (the 'users' version counter).
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=60.0, cast=float)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=10000, cast=int)
+AUTH_USER_CACHE_CHECK_INTERVAL = config('AUTH_USER_CACHE_CHECK_INTERVAL', default=5.0, cast=float)
+
+# Build request.user from the signed token's claims instead of the database.
+# Deactivated users then keep access until their access token expires.
+AUTH_USER_FROM_TOKEN_CLAIMS = config('AUTH_USER_FROM_TOKEN_CLAIMS', default=False, cast=bool)
+
+# Build in-memory catalog structures when the WSGI app loads (see pcbuilder/warmup.py)
+WARM_UP_ON_START = config('WARM_UP_ON_START', default=True, cast=bool)
+
 
 
 
@@ -5,7 +5,8 @@ from rest_framework.routers import DefaultRouter
 from pcbuilder.auth_views import LoginView, LogoutView, MeView, MyTokenObtainPairView, RegisterView
 from pcbuilder.views import (
     UserViewSet, CategoryViewSet, VendorViewSet, ComponentViewSet, 
-    BuildViewSet, BuildComponentView, PublicBuildViewSet, CurrentUserView, CompatibilityView
+    BuildViewSet, BuildComponentView, PublicBuildViewSet, CurrentUserView, CompatibilityView,
+    CompatibilityCandidatesView
 )
 from rest_framework_simplejwt.views import (
     TokenBlacklistView,
@@ -61,6 +62,7 @@ urlpatterns = [
     path('api/v1/builds/<int:build_id>/components/', BuildComponentView.as_view(), name='build-components'),
     path('api/v1/builds/<int:build_id>/components/<int:component_id>/', BuildComponentView.as_view(), name='build-component-detail'),
     path('api/v1/compatibility/', CompatibilityView.as_view(), name='compatibility'),
+    path('api/v1/compatibility/candidates/', CompatibilityCandidatesView.as_view(), name='compatibility-candidates'),
     # path('api/v1/', include('pcbuilder.urls')),
     
     # Swagger URLs
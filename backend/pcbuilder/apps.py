@@ -1,6 +1,52 @@
 from django.apps import AppConfig
+from django.core.signals import request_finished
+from django.db.models.signals import post_delete, post_save
 
 
 class PcbuilderConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pcbuilder'
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registers the database checks)
+        from .catalog_cache import invalidate_catalog_cache
+        from .compatibility_checker import invalidate_rule_table
+        from .compatibility_matrix import refresh_component_pairs
+        from .database import release_connections
+        from .identity_map import forget_component
+        from .spec_cache import invalidate_component_specs
+
+        # Hand pooled SQLite connections back once each request is done
+        request_finished.connect(release_connections, dispatch_uid='pcbuilder_release_connections')
+
+        # Rule edits made through the admin take effect in this process right
+        # away; other processes notice through the version counter
+        for model_name in ('CompatibilityRule', 'Category'):
+            model = self.get_model(model_name)
+            for signal in (post_save, post_delete):
+                signal.connect(invalidate_rule_table, sender=model,
+                               dispatch_uid=f'pcbuilder_rule_table_{model_name}_{signal is post_save}')
+
+        # Catalog edits made through the admin show up in this process right
+        # away; other processes notice through the version counter
+        for model_name in ('Category', 'Vendor', 'Component'):
+            model = self.get_model(model_name)
+            for signal in (post_save, post_delete):
+                signal.connect(invalidate_catalog_cache, sender=model,
+                               dispatch_uid=f'pcbuilder_catalog_cache_{model_name}_{signal is post_save}')
+
+        # Parsed specs are also re-read whenever the raw specs string changes
+        component = self.get_model('Component')
+        post_save.connect(invalidate_component_specs, sender=component,
+                          dispatch_uid='pcbuilder_spec_cache_save')
+        post_delete.connect(invalidate_component_specs, sender=component,
+                            dispatch_uid='pcbuilder_spec_cache_delete')
+        post_save.connect(forget_component, sender=component,
+                          dispatch_uid='pcbuilder_identity_map_save')
+        post_delete.connect(forget_component, sender=component,
+                            dispatch_uid='pcbuilder_identity_map_delete')
+
+        # Keep the precomputed compatibility matrix current for admin edits;
+        # deleted components lose their pairs through a trigger
+        post_save.connect(refresh_component_pairs, sender=component,
+                          dispatch_uid='pcbuilder_matrix_refresh')
@@ -1,9 +1,12 @@
+from django.conf import settings
 from django.contrib.auth.backends import BaseBackend
 from django.contrib.auth.hashers import check_password
 from django.contrib.auth.models import AnonymousUser
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from .database import UserDB
+from .user_cache import user_cache
 
 class SimpleUser:
     """Simple user object that Django can work with"""
@@ -22,6 +25,29 @@ class SimpleUser:
         
         # Store the original user data
         self._user_data = user_data
+        self.from_claims = False
+    
+    @classmethod
+    def from_token_claims(cls, validated_token):
+        """Build a user from the claims LoginView/RegisterView put in the token, if present"""
+        if any(claim not in validated_token for claim in ('user_id', 'username', 'email')):
+            return None
+        user = cls({
+            'id': validated_token['user_id'],
+            'username': validated_token['username'],
+            'email': validated_token['email'],
+        })
+        user.from_claims = True
+        return user
+    
+    def get_user_data(self, user_db=None):
+        """
+        The user's row as loaded during authentication, or fetched again when
+        the user was built from token claims and the row is incomplete
+        """
+        if not self.from_claims:
+            return self._user_data
+        return (user_db or UserDB()).get_user_by_id(self.id)
     
     def get_username(self):
         return self.username
@@ -38,18 +64,34 @@ class CustomJWTAuthentication(JWTAuthentication):
     def get_user(self, validated_token):
         """
         Attempts to find and return a user using the given validated token.
+        
+        Users are served from the short-lived user cache (AUTH_USER_CACHE_TTL),
+        or built from the token's own claims when AUTH_USER_FROM_TOKEN_CLAIMS
+        is set, so most requests do not query pcbuilder_user at all.
         """
+        if getattr(settings, 'AUTH_USER_FROM_TOKEN_CLAIMS', False):
+            user = SimpleUser.from_token_claims(validated_token)
+            if user is not None:
+                return user
+        
         try:
             user_id = validated_token['user_id']
-            user_db = UserDB()
-            user_data = user_db.get_user_by_id(user_id)
-            
-            if user_data:
-                return SimpleUser(user_data)
-            else:
-                raise InvalidToken('User not found')
+            user = user_cache.get(user_id)
+            if user is None:
+                user_db = UserDB()
+                user_data = user_db.get_user_by_id(user_id)
+                
+                if user_data:
+                    user = SimpleUser(user_data)
+                    user_cache.set(user_id, user)
+                else:
+                    raise InvalidToken('User not found')
         except Exception as e:
             raise InvalidToken('User not found')
+        
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        return user
 
 class SQLiteAuthBackend(BaseBackend):
     def authenticate(self, request, username=None, email=None, password=None):
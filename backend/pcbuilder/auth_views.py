@@ -24,7 +24,7 @@ class MeView(APIView):
     @swagger_auto_schema(responses={200: MeSerializer})
     def get(self, request):
         if request.user.is_authenticated:
-            user = self.user_db.get_user_by_id(request.user.id)
+            user = request.user.get_user_data(self.user_db)
             if user:
                 serializer = MeSerializer(user)
                 return Response(serializer.data)
@@ -0,0 +1,125 @@
+import bisect
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from .database import ComponentDB, DataVersionDB, VendorDB, release_connections
+
+_word_start = re.compile(r'\b\w')
+
+
+class PrefixIndex:
+    """
+    Sorted array of lowercased name suffixes starting at each word, so that
+    "4090" finds "NVIDIA RTX 4090" as well as names that start with it.
+    A lookup is a bisect plus a short scan over the matching range.
+    """
+    # Upper bound on entries scanned per lookup, keeps one-letter prefixes cheap
+    max_scan = 2000
+
+    def __init__(self, items: List[Dict[str, Any]]):
+        entries = []
+        for position, item in enumerate(items):
+            name = (item.get('name') or '').lower()
+            for match in _word_start.finditer(name):
+                entries.append((name[match.start():], position))
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.positions = [position for _, position in entries]
+        self.items = items
+
+    def lookup(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self.keys, prefix)
+        end = min(len(self.keys), start + self.max_scan)
+        seen = set()
+        results = []
+        for index in range(start, end):
+            if not self.keys[index].startswith(prefix):
+                break
+            position = self.positions[index]
+            if position in seen:
+                continue
+            seen.add(position)
+            results.append(self.items[position])
+            if len(results) >= limit:
+                break
+        return results
+
+    def __len__(self):
+        return len(self.items)
+
+
+class Autocomplete:
+    """
+    Component and vendor name completions served from memory.
+
+    The index is built from ComponentDB on first use (or at worker start,
+    see warm()) and rebuilt in a background thread once the catalog version
+    changes, so lookups never wait on the database after the first build.
+    """
+    def __init__(self):
+        self.components: Optional[PrefixIndex] = None
+        self.vendors: Optional[PrefixIndex] = None
+        self.version = None
+        self.checked_at = 0.0
+        self._lock = threading.Lock()
+        self._rebuilding = False
+
+    def build(self):
+        version = DataVersionDB().get_version('catalog')
+        components = PrefixIndex([
+            {'id': row['id'], 'name': row['name'], 'category_slug': row['category_slug']}
+            for row in ComponentDB().get_component_names()
+        ])
+        vendors = PrefixIndex([
+            {'id': row['id'], 'name': row['name']}
+            for row in VendorDB().get_all_vendors()
+        ])
+        with self._lock:
+            self.components, self.vendors, self.version = components, vendors, version
+            self.checked_at = time.monotonic()
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+
+        def run():
+            try:
+                self.build()
+            finally:
+                self._rebuilding = False
+                release_connections()
+
+        threading.Thread(target=run, name='autocomplete-rebuild', daemon=True).start()
+
+    def _ensure_current(self):
+        if self.components is None:
+            self.build()
+            return
+        interval = getattr(settings, 'AUTOCOMPLETE_REFRESH_INTERVAL', 5.0)
+        if time.monotonic() - self.checked_at < interval:
+            return
+        self.checked_at = time.monotonic()
+        if DataVersionDB().get_version('catalog') != self.version:
+            self._rebuild_in_background()
+
+    def warm(self):
+        if self.components is None:
+            self.build()
+
+    def suggest(self, prefix: str, limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        self._ensure_current()
+        components, vendors = self.components, self.vendors
+        return {
+            'components': components.lookup(prefix, limit),
+            'vendors': vendors.lookup(prefix, limit),
+        }
+
+
+autocomplete = Autocomplete()
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha1
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .database import CategoryDB, ComponentDB, DataVersionDB, VendorDB
+from .renderers import Fragment
+from .sql_serializers import CategorySerializer, VendorSerializer
+
+_missing = object()
+
+
+class CatalogCache:
+    """
+    Catalog query results (categories, vendors, component pages) cached per
+    worker and keyed by the 'catalog' version counter, which triggers bump on
+    every write to the category, vendor and component tables (migration 0007).
+
+    The version is re-read at most every CATALOG_CACHE_CHECK_INTERVAL
+    seconds; when it moved, the local entries are dropped. If
+    CATALOG_CACHE_ALIAS names a Django cache, misses are looked up there
+    before querying SQLite, so one worker's work is shared with the others.
+    Cached values are shared between requests and must not be modified.
+    """
+    def __init__(self, max_size: int = 1000):
+        self.max_size = max_size
+        self.version = None
+        self.checked_at = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _shared(self):
+        alias = getattr(settings, 'CATALOG_CACHE_ALIAS', '')
+        return caches[alias] if alias else None
+
+    def current_version(self) -> int:
+        interval = getattr(settings, 'CATALOG_CACHE_CHECK_INTERVAL', 5.0)
+        if self.version is not None and time.monotonic() - self.checked_at < interval:
+            return self.version
+        version = DataVersionDB().get_version('catalog')
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            self.checked_at = time.monotonic()
+        return version
+
+    def get(self, key: tuple, load: Callable[[], Any]) -> Any:
+        """Cached value for `key`, calling `load()` on a miss"""
+        version = self.current_version()
+        local_key = repr(key)
+        with self._lock:
+            value = self._entries.get(local_key, _missing)
+            if value is not _missing:
+                self._entries.move_to_end(local_key)
+
+        if value is _missing:
+            shared = self._shared()
+            shared_key = f"pcbuilder:catalog:{version}:{sha1(local_key.encode()).hexdigest()}"
+            value = shared.get(shared_key, _missing) if shared is not None else _missing
+            if value is _missing:
+                value = load()
+                if shared is not None:
+                    shared.set(shared_key, value, getattr(settings, 'CATALOG_CACHE_TIMEOUT', 3600))
+            with self._lock:
+                if version == self.version:
+                    self._entries[local_key] = value
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+
+        # Callers may reorder or slice the list they get back
+        return list(value) if isinstance(value, list) else value
+
+    def invalidate(self):
+        """Drop local entries and re-read the version on the next lookup"""
+        with self._lock:
+            self._entries.clear()
+            self.version = None
+
+    def categories_fragment(self) -> Fragment:
+        """The encoded category list, as the categories endpoint serves it"""
+        return self.get(('categories', 'json'), lambda: Fragment.encode(
+            CategorySerializer(CategoryDB().get_all_categories(), many=True).data
+        ))
+
+    def vendors_fragment(self) -> Fragment:
+        """The encoded vendor list, as the vendors endpoint serves it"""
+        return self.get(('vendors', 'json'), lambda: Fragment.encode(
+            VendorSerializer(VendorDB().get_all_vendors(), many=True).data
+        ))
+
+    def warm(self):
+        """Load the lists every client asks for first"""
+        self.categories_fragment()
+        self.vendors_fragment()
+        component_db = ComponentDB()
+        categories = CategoryDB().get_all_categories()
+        limit = (settings.REST_FRAMEWORK.get('PAGE_SIZE') or 10) + 1
+        for slug in [None] + [category['slug'] for category in categories]:
+            self.get(
+                components_page_key(limit, None, None, slug, {}),
+                lambda: component_db.get_components_page(limit, category_slug=slug),
+            )
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def components_page_key(limit: int, after: Optional[tuple], before: Optional[tuple],
+                        category_slug: Optional[str], filters: dict) -> tuple:
+    """Cache key for one ComponentDB.get_components_page call"""
+    return ('components', limit, after, before, category_slug, sorted(filters.items()))
+
+
+catalog_cache = CatalogCache(getattr(settings, 'CATALOG_CACHE_SIZE', 1000))
+
+
+def invalidate_catalog_cache(sender=None, **kwargs):
+    """post_save/post_delete receiver for Category, Vendor and Component"""
+    catalog_cache.invalidate()
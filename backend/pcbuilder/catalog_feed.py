@@ -0,0 +1,161 @@
+import csv
+import io
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .spec_cache import validate_specs
+
+FORMATS = ('csv', 'jsonl')
+
+# CSV columns; specs is a JSON object in its own column
+CSV_COLUMNS = ('name', 'description', 'price', 'category_slug', 'vendor_name', 'image', 'stock', 'specs')
+
+
+class FeedError(ValueError):
+    """A record that cannot be imported, with the byte offset it ends at"""
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+def feed_format(path: str) -> str:
+    """'csv' or 'jsonl', from the file extension"""
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    if extension in ('jsonl', 'ndjson'):
+        return 'jsonl'
+    if extension == 'csv':
+        return 'csv'
+    raise ValueError(f"Cannot tell the format of {path}; use --format")
+
+
+def _lines(stream, offset: int, position: List[int]) -> Iterator[str]:
+    """Decoded lines from a binary stream, keeping position[0] at the end of the last one"""
+    position[0] = offset
+    for line in stream:
+        position[0] += len(line)
+        yield line.decode('utf-8')
+
+
+def read_jsonl(stream, offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """(record, end offset) pairs; records that do not parse come as FeedErrors"""
+    stream.seek(offset)
+    position = [offset]
+    for line in _lines(stream, offset, position):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield FeedError(f"invalid JSON: {error}", position[0]), position[0]
+            continue
+        if not isinstance(record, dict):
+            yield FeedError("record is not a JSON object", position[0]), position[0]
+            continue
+        yield record, position[0]
+
+
+def read_csv(stream, offset: int = 0) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    (record, end offset) pairs from a CSV file with a header row. Resuming
+    from an offset re-reads the header first. The csv reader pulls one line
+    at a time, so the offset after a row is exactly where the next one starts,
+    including for quoted values that span lines.
+    """
+    stream.seek(0)
+    header = next(csv.reader(io.TextIOWrapper(io.BytesIO(stream.readline()), encoding='utf-8-sig')), None)
+    if header is None:
+        return
+    header = [column.strip() for column in header]
+    start = max(offset, stream.tell())
+    stream.seek(start)
+    position = [start]
+    for row in csv.reader(_lines(stream, start, position)):
+        if not row:
+            continue
+        if len(row) != len(header):
+            yield FeedError(f"expected {len(header)} columns, got {len(row)}", position[0]), position[0]
+            continue
+        yield dict(zip(header, row)), position[0]
+
+
+READERS: Dict[str, Callable] = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+}
+
+
+def clean_record(record: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    """
+    Coerce a raw record (CSV values are all strings) into the shape
+    CatalogLoader expects and check its specs against its category.
+    Returns (record, []) or (None, problems).
+    """
+    errors = []
+    for key in ('name', 'category_slug', 'vendor_name'):
+        if not str(record.get(key) or '').strip():
+            errors.append(f"missing '{key}'")
+
+    try:
+        price = float(record.get('price'))
+        if price < 0:
+            errors.append("'price' is negative")
+    except (TypeError, ValueError):
+        errors.append("'price' is not a number")
+
+    stock = record.get('stock')
+    if stock in (None, ''):
+        stock = None
+    else:
+        try:
+            stock = int(stock)
+        except (TypeError, ValueError):
+            errors.append("'stock' is not an integer")
+
+    specs = record.get('specs') or {}
+    if isinstance(specs, str):
+        try:
+            specs = json.loads(specs)
+        except ValueError:
+            errors.append("'specs' is not valid JSON")
+            specs = None
+    if specs is not None and not errors:
+        errors.extend(validate_specs(str(record['category_slug']).strip(), specs))
+
+    if errors:
+        return None, errors
+    cleaned = {
+        'name': str(record['name']).strip(),
+        'description': record.get('description') or '',
+        'price': round(price, 2),
+        'category_slug': str(record['category_slug']).strip(),
+        'vendor_name': str(record['vendor_name']).strip(),
+        'image': record.get('image') or '',
+        'specs': specs,
+    }
+    if stock is not None:
+        cleaned['stock'] = stock
+    return cleaned, []
+
+
+def read_feed(path: str, format: Optional[str] = None, offset: int = 0,
+              on_error: Optional[Callable[[FeedError], None]] = None) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """
+    Stream the valid, cleaned records of a feed file as (record, end offset)
+    pairs, starting at a byte offset. Records that fail to parse or validate
+    are passed to `on_error` and left out. The file is read a line at a
+    time, so memory use does not depend on its size.
+    """
+    reader = READERS[format or feed_format(path)]
+    with open(path, 'rb') as stream:
+        for record, end in reader(stream, offset):
+            if not isinstance(record, FeedError):
+                name = record.get('name')
+                record, errors = clean_record(record)
+                if errors:
+                    record = FeedError(f"{name!r}: {'; '.join(errors)}", end)
+            if isinstance(record, FeedError):
+                if on_error is not None:
+                    on_error(record)
+                continue
+            yield record, end
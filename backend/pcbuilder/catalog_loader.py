@@ -0,0 +1,259 @@
+import json
+from hashlib import sha1
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from .catalog_cache import catalog_cache
+from .database import BuildDB, DatabaseManager, DataVersionDB
+
+CATEGORY_INSERT = """
+INSERT INTO pcbuilder_category (name, slug, icon) VALUES (?, ?, ?)
+ON CONFLICT DO NOTHING
+"""
+
+VENDOR_INSERT = """
+INSERT INTO pcbuilder_vendor (name, website, logo) VALUES (?, ?, ?)
+ON CONFLICT DO NOTHING
+"""
+
+# Rows that are already identical are left alone, so reloading a feed does
+# not fire the catalog version, search index and matrix triggers for them
+COMPONENT_UPSERT = """
+INSERT INTO pcbuilder_component (
+    name, description, price, category_id, vendor_id, image, specs, stock
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (vendor_id, name) DO UPDATE SET
+    description = excluded.description,
+    price = excluded.price,
+    category_id = excluded.category_id,
+    image = excluded.image,
+    specs = excluded.specs,
+    stock = excluded.stock
+WHERE description IS NOT excluded.description
+    OR price IS NOT excluded.price
+    OR category_id IS NOT excluded.category_id
+    OR image IS NOT excluded.image
+    OR specs IS NOT excluded.specs
+    OR stock IS NOT excluded.stock
+"""
+
+# While set, the per-row search index and catalog version triggers on
+# pcbuilder_component stand down (migration 0011)
+SET_BULK_LOAD = "UPDATE pcbuilder_dataversion SET version = ? WHERE name = 'catalog_bulk_load'"
+
+# Search index rows for the components inserted after a given id
+INDEX_NEW_COMPONENTS = """
+INSERT INTO pcbuilder_component_fts (rowid, name, description, vendor, specs)
+SELECT c.id, c.name, c.description, v.name,
+    CASE WHEN json_valid(c.specs) THEN (
+        SELECT group_concat(value, ' ') FROM json_tree(c.specs)
+        WHERE type NOT IN ('object', 'array')
+    ) ELSE c.specs END
+FROM pcbuilder_component c
+JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+WHERE c.id > ?
+"""
+
+# Current id, price and last synced content hash of components, by (vendor, name)
+# (a join rather than a row-value IN, which some SQLite versions answer with a scan)
+HASH_LOOKUP = """
+WITH wanted (vendor_id, name) AS (VALUES {keys})
+SELECT c.id, c.vendor_id, c.name, c.price, h.content_hash
+FROM wanted w
+JOIN pcbuilder_component c ON c.vendor_id = w.vendor_id AND c.name = w.name
+LEFT JOIN pcbuilder_componenthash h ON h.component_id = c.id
+"""
+
+HASH_UPSERT = """
+INSERT INTO pcbuilder_componenthash (component_id, content_hash) VALUES (?, ?)
+ON CONFLICT (component_id) DO UPDATE SET content_hash = excluded.content_hash
+"""
+
+
+def row_key(row: tuple) -> tuple:
+    """(vendor_id, name) of a COMPONENT_UPSERT parameter tuple"""
+    return row[4], row[0]
+
+
+def content_hash(row: tuple) -> str:
+    """Hash of a COMPONENT_UPSERT parameter tuple"""
+    return sha1(json.dumps(row).encode()).hexdigest()
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Lists of up to `size` items, consuming `items` lazily"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class CatalogLoader:
+    """
+    Streams catalog records into the category, vendor and component tables.
+
+    Records are plain dicts shaped like the entries in populate_database.py
+    (components name their category by slug and their vendor by name). They
+    are consumed lazily and written `batch_size` at a time, each batch with
+    one executemany in one transaction. Category and vendor ids come from
+    maps loaded once, not from a query per record.
+
+    Components are matched on (vendor, name): new ones are inserted and
+    changed ones updated in place, and builds containing a part whose price
+    changed get their total recomputed. Categories and vendors that already
+    exist are kept as they are.
+    """
+    def __init__(self, batch_size: int = 5000, default_stock: int = 100):
+        self.batch_size = batch_size
+        self.default_stock = default_stock
+        self.db = DatabaseManager()
+        self.category_ids: Dict[str, int] = {}
+        self.vendor_ids: Dict[str, int] = {}
+
+    def load_ids(self):
+        """Refresh the slug -> category id and name -> vendor id maps"""
+        self.category_ids = {
+            row['slug']: row['id'] for row in self.db.execute_query("SELECT id, slug FROM pcbuilder_category")
+        }
+        self.vendor_ids = {
+            row['name']: row['id'] for row in self.db.execute_query("SELECT id, name FROM pcbuilder_vendor")
+        }
+
+    def load_categories(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert missing categories; returns how many were created"""
+        params = [(record['name'], record['slug'], record.get('icon', '')) for record in records]
+        with self.db.transaction():
+            created = self.db.execute_many(CATEGORY_INSERT, params)
+        self.load_ids()
+        return created
+
+    def load_vendors(self, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert missing vendors; returns how many were created"""
+        params = [(record['name'], record.get('website', ''), record.get('logo', '')) for record in records]
+        with self.db.transaction():
+            created = self.db.execute_many(VENDOR_INSERT, params)
+        self.load_ids()
+        return created
+
+    def component_row(self, record: Dict[str, Any]) -> Optional[tuple]:
+        """Parameters for COMPONENT_UPSERT, or None if the category or vendor is unknown"""
+        category_id = self.category_ids.get(record['category_slug'])
+        vendor_id = self.vendor_ids.get(record['vendor_name'])
+        if category_id is None or vendor_id is None:
+            return None
+        specs = record.get('specs') or {}
+        if not isinstance(specs, str):
+            specs = json.dumps(specs)
+        return (
+            record['name'], record.get('description', ''), record['price'], category_id, vendor_id,
+            record.get('image', ''), specs, record.get('stock', self.default_stock),
+        )
+
+    def upsert_rows(self, rows: List[tuple]) -> int:
+        """
+        Write one batch of component rows in one transaction; returns rows
+        inserted or changed. New rows are added to the search index together
+        and the catalog version is bumped once, instead of per row.
+        """
+        with self.db.transaction():
+            self.db.execute_update(SET_BULK_LOAD, (1,))
+            # AUTOINCREMENT ids, so everything inserted below comes after this
+            last_id = self.db.execute_query("SELECT COALESCE(MAX(id), 0) AS id FROM pcbuilder_component")[0]['id']
+            written = self.db.execute_many(COMPONENT_UPSERT, rows)
+            if written:
+                self.db.execute_update(INDEX_NEW_COMPONENTS, (last_id,))
+                DataVersionDB().bump_version('catalog')
+            self.db.execute_update(SET_BULK_LOAD, (0,))
+            return written
+
+    def lookup(self, rows: List[tuple]) -> Dict[tuple, Dict[str, Any]]:
+        """Stored id, price and content hash of the components these rows would write"""
+        found = {}
+        keys = [row_key(row) for row in rows]
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            query = HASH_LOOKUP.format(keys=', '.join(['(?, ?)'] * len(chunk)))
+            params = tuple(value for key in chunk for value in key)
+            for row in self.db.execute_query(query, params):
+                found[(row['vendor_id'], row['name'])] = row
+        return found
+
+    def write_rows(self, rows: List[tuple], stats: Dict[str, int], sync: bool = False) -> int:
+        """
+        Upsert one batch in one transaction, then refresh the totals of builds
+        containing components whose price changed. Compatibility pairs of
+        components whose specs or category changed are dropped by trigger and
+        checked live until the matrix is rebuilt.
+
+        With `sync`, rows whose content hash matches the one stored at the last
+        sync are not written at all, and the hashes of the written ones are
+        stored. Returns rows inserted or changed.
+        """
+        stored = self.lookup(rows)
+        if sync:
+            changed = {}
+            for row in rows:
+                digest = content_hash(row)
+                current = stored.get(row_key(row))
+                if current is None or current['content_hash'] != digest:
+                    # A feed listing the same component twice: the last one wins
+                    changed[row_key(row)] = (row, digest)
+            stats['unchanged'] += len(rows) - len(changed)
+            rows = [row for row, _ in changed.values()]
+            if not rows:
+                return 0
+
+        with self.db.transaction():
+            written = self.upsert_rows(rows)
+            if sync:
+                ids = self.lookup(rows)
+                self.db.execute_many(HASH_UPSERT, [
+                    (ids[key]['id'], digest) for key, (_, digest) in changed.items()
+                ])
+            repriced = [
+                stored[row_key(row)]['id'] for row in rows
+                if row_key(row) in stored and stored[row_key(row)]['price'] != row[2]
+            ]
+            if repriced:
+                stats['builds_repriced'] += BuildDB().update_total_prices_for_components(repriced)
+        return written
+
+    def load_components(self, records: Iterable[Dict[str, Any]],
+                        progress: Optional[Callable[[Dict[str, int]], None]] = None,
+                        stats: Optional[Dict[str, int]] = None, sync: bool = False) -> Dict[str, int]:
+        """
+        Upsert components from any iterable of records, including generators
+        over files too large to hold in memory. `progress(stats)` is called
+        after each batch is committed; pass `stats` to keep adding to the
+        counts of an earlier run.
+
+        With `sync`, records are compared to the content hashes stored by the
+        previous sync and only changed ones are written (see write_rows), so
+        the database work follows the size of the change, not of the feed.
+        Returns {'records', 'written', 'skipped', 'batches', 'unchanged', 'builds_repriced'}.
+        """
+        if not self.category_ids or not self.vendor_ids:
+            self.load_ids()
+        stats = dict(stats or {})
+        for key in ('records', 'written', 'skipped', 'batches', 'unchanged', 'builds_repriced'):
+            stats.setdefault(key, 0)
+        for batch in batched(records, self.batch_size):
+            rows = []
+            for record in batch:
+                row = self.component_row(record)
+                if row is None:
+                    stats['skipped'] += 1
+                else:
+                    rows.append(row)
+            stats['records'] += len(batch)
+            if rows:
+                stats['written'] += self.write_rows(rows, stats, sync)
+                stats['batches'] += 1
+            if progress is not None:
+                progress(stats)
+        # Other processes notice through the catalog version the triggers bumped
+        catalog_cache.invalidate()
+        return stats
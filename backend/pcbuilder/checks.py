@@ -0,0 +1,80 @@
+from django.core import checks
+from django.db import connections
+from django.db.migrations.recorder import MigrationRecorder
+
+# Triggers, indexes and tables created with RunSQL. Django's migration state
+# does not know them, so when a later migration rebuilds a table (SQLite
+# does that for most AlterField/AddConstraint operations) the ones on that
+# table are dropped without a word. Keyed by the migration that creates them.
+RAW_SQL_OBJECTS = {
+    '0004_data_versions': [
+        'pcbuilder_dataversion',
+        'pcbuilder_compatibilityrule_version_insert',
+        'pcbuilder_compatibilityrule_version_update',
+        'pcbuilder_compatibilityrule_version_delete',
+    ],
+    '0005_compatibility_matrix': [
+        'pcbuilder_compatibilitymatrix',
+        'pcbuilder_compatibilitymatrix_b',
+        'pcbuilder_component_matrix_update',
+        'pcbuilder_component_matrix_delete',
+    ],
+    '0006_component_search': [
+        'pcbuilder_component_fts',
+        'pcbuilder_component_fts_insert',
+        'pcbuilder_component_fts_update',
+        'pcbuilder_component_fts_delete',
+        'pcbuilder_vendor_fts_update',
+    ],
+    '0007_catalog_version': [
+        f'{table}_catalog_version_{event}'
+        for table in ('pcbuilder_category', 'pcbuilder_vendor', 'pcbuilder_component')
+        for event in ('insert', 'update', 'delete')
+    ],
+    '0009_query_indexes': [
+        'pcbuilder_build_user_created',
+        'pcbuilder_build_public_created',
+        'pcbuilder_buildcomponent_build_component',
+        'pcbuilder_compatibilityrule_source_target',
+    ],
+    '0010_public_build_updated_index': [
+        'pcbuilder_build_public_updated',
+    ],
+    '0012_catalog_sync': [
+        'pcbuilder_componenthash',
+        'pcbuilder_component_hash_update',
+        'pcbuilder_component_hash_delete',
+    ],
+    '0013_user_version': [
+        'pcbuilder_user_version_update',
+        'pcbuilder_user_version_delete',
+    ],
+}
+
+
+@checks.register(checks.Tags.database)
+def check_raw_sql_objects(app_configs=None, databases=None, **kwargs):
+    """Report RunSQL objects missing although their migration is applied"""
+    if not databases or 'default' not in databases:
+        return []
+    connection = connections['default']
+    recorder = MigrationRecorder(connection)
+    if connection.vendor != 'sqlite' or not recorder.has_table():
+        return []
+    applied = {name for app, name in recorder.applied_migrations() if app == 'pcbuilder'}
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master")
+        existing = {row[0] for row in cursor.fetchall()}
+    warnings = []
+    for migration, names in RAW_SQL_OBJECTS.items():
+        missing = [name for name in names if migration in applied and name not in existing]
+        if missing:
+            warnings.append(checks.Warning(
+                f"Database objects created by pcbuilder migration {migration} are missing: {', '.join(missing)}",
+                hint=(
+                    "A later migration probably rebuilt their table. Add a migration that runs "
+                    f"the CREATE statements of {migration} again."
+                ),
+                id='pcbuilder.W001',
+            ))
+    return warnings
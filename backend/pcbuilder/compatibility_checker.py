@@ -1,11 +1,117 @@
 import json
-from typing import Dict, List, Tuple, Optional
-from .database import ComponentDB, CategoryDB, DatabaseManager
+import threading
+import time
+from typing import Callable, Dict, List, Tuple, Optional
+from django.conf import settings
+from .database import ComponentDB, CompatibilityMatrixDB, DatabaseManager, DataVersionDB
+from .spec_cache import SpecRecord, spec_cache
+
+# Rule type (the "rule" key of a rule's condition) -> checker method name
+RULE_HANDLERS = {
+    'socket_match': '_check_socket_match',
+    'gpu_length_fit': '_check_gpu_length_fit',
+    'cooler_height_fit': '_check_cooler_height_fit',
+    'psu_length_fit': '_check_psu_length_fit',
+    'power_requirement': '_check_power_requirement',
+    'form_factor_match': '_check_form_factor_match',
+}
+
+class CompiledRule:
+    """A compatibility rule with its condition parsed and its handler resolved"""
+    __slots__ = ('rule_type', 'condition', 'handler')
+    
+    def __init__(self, condition: Dict, handler: Callable):
+        self.rule_type = condition.get('rule')
+        self.condition = condition
+        self.handler = handler
+
+class RuleTable:
+    """
+    In-memory copy of pcbuilder_compatibilityrule, keyed by category slug pair.
+    Both (a, b) and (b, a) map to the same rules, so a lookup is one dict access.
+    """
+    def __init__(self, rules: Dict[Tuple[str, str], List[CompiledRule]], version: int):
+        self.rules = rules
+        self.version = version
+        self.checked_at = time.monotonic()
+    
+    @classmethod
+    def load(cls) -> 'RuleTable':
+        db = DatabaseManager()
+        version = DataVersionDB().get_version('compatibility_rules')
+        rows = db.execute_query(
+            """SELECT src.slug as source_slug, tgt.slug as target_slug, r.condition
+               FROM pcbuilder_compatibilityrule r
+               JOIN pcbuilder_category src ON r.source_id = src.id
+               JOIN pcbuilder_category tgt ON r.target_id = tgt.id
+               ORDER BY r.id"""
+        )
+        rules = {}
+        for row in rows:
+            condition = json.loads(row['condition'])
+            handler_name = RULE_HANDLERS.get(condition.get('rule'))
+            if handler_name:
+                handler = getattr(CompatibilityChecker, handler_name)
+            else:
+                handler = _unknown_rule(condition.get('rule'))
+            compiled = CompiledRule(condition, handler)
+            pair = (row['source_slug'], row['target_slug'])
+            rules.setdefault(pair, []).append(compiled)
+            if pair[0] != pair[1]:
+                rules.setdefault((pair[1], pair[0]), []).append(compiled)
+        return cls(rules, version)
+    
+    def rules_for(self, category1_slug: str, category2_slug: str) -> List[CompiledRule]:
+        return self.rules.get((category1_slug, category2_slug), [])
+
+_rule_table: Optional[RuleTable] = None
+_rule_table_lock = threading.Lock()
+
+def get_rule_table() -> RuleTable:
+    """
+    Get the shared rule table, reloading it when the rules changed.
+    The version counter is only consulted every
+    COMPATIBILITY_RULES_CHECK_INTERVAL seconds.
+    """
+    global _rule_table
+    table = _rule_table
+    interval = getattr(settings, 'COMPATIBILITY_RULES_CHECK_INTERVAL', 5.0)
+    if table is not None and time.monotonic() - table.checked_at < interval:
+        return table
+    with _rule_table_lock:
+        table = _rule_table
+        if table is not None and time.monotonic() - table.checked_at >= interval:
+            if DataVersionDB().get_version('compatibility_rules') == table.version:
+                table.checked_at = time.monotonic()
+            else:
+                table = None
+        if table is None:
+            table = _rule_table = RuleTable.load()
+    return table
+
+def invalidate_rule_table(**kwargs):
+    """Drop the cached rule table (also used as a signal receiver)"""
+    global _rule_table
+    _rule_table = None
+
+def _unknown_rule(rule_type: str) -> Callable:
+    """Handler for rule types the checker does not implement"""
+    def check(checker, comp1: Dict, comp2: Dict) -> Dict[str, any]:
+        return {
+            'compatible': True,
+            'status': 'green',
+            'message': f'Unknown rule type: {rule_type}',
+            'rule': rule_type
+        }
+    return check
 
 class CompatibilityChecker:
     def __init__(self):
         self.component_db = ComponentDB()
+        self.matrix_db = CompatibilityMatrixDB()
         self.db = DatabaseManager()
+        # Answer from the precomputed pair table when it has the pair
+        self.use_matrix = getattr(settings, 'COMPATIBILITY_MATRIX_ENABLED', True)
     
     def check_compatibility(self, component1_id: int, component2_id: int) -> Dict[str, any]:
         """
@@ -17,6 +123,11 @@ class CompatibilityChecker:
             'rule': str
         }
         """
+        if self.use_matrix:
+            stored = self.matrix_db.get_pair(component1_id, component2_id, get_rule_table().version)
+            if stored:
+                return self._stored_result(stored)
+        
         # Get component details
         comp1 = self.component_db.get_component_by_id(component1_id)
         comp2 = self.component_db.get_component_by_id(component2_id)
@@ -30,7 +141,7 @@ class CompatibilityChecker:
             }
         
         # Get compatibility rules
-        rules = self._get_compatibility_rules(comp1['category_slug'], comp2['category_slug'])
+        rules = get_rule_table().rules_for(comp1['category_slug'], comp2['category_slug'])
         
         if not rules:
             return {
@@ -40,22 +151,14 @@ class CompatibilityChecker:
                 'rule': 'no_rules'
             }
         
-        # Check each rule
-        for rule in rules:
-            result = self._check_rule(comp1, comp2, rule)
-            if not result['compatible']:
-                return result
-        
-        return {
-            'compatible': True,
-            'status': 'green',
-            'message': 'All compatibility checks passed',
-            'rule': 'all_passed'
-        }
+        return self._evaluate_rules(comp1, comp2, rules)
     
     def check_build_compatibility(self, build_components: List[Dict]) -> Dict[str, any]:
         """
-        Check compatibility for an entire build
+        Check compatibility for an entire build from already-loaded component
+        rows (as returned by ComponentDB). Nothing is re-fetched: specs are
+        parsed once per component and only pairs whose categories have rules
+        are evaluated.
         Returns: {
             'overall_compatible': bool,
             'status': 'green' | 'red' | 'yellow',
@@ -65,11 +168,16 @@ class CompatibilityChecker:
         """
         issues = []
         warnings = []
+        rule_table = get_rule_table()
+        components = [self._with_parsed_specs(comp) for comp in build_components]
         
         # Check all component pairs
-        for i, comp1 in enumerate(build_components):
-            for j, comp2 in enumerate(build_components[i+1:], i+1):
-                result = self.check_compatibility(comp1['id'], comp2['id'])
+        for i, comp1 in enumerate(components):
+            for j, comp2 in enumerate(components[i+1:], i+1):
+                rules = rule_table.rules_for(comp1['category_slug'], comp2['category_slug'])
+                if not rules:
+                    continue
+                result = self._evaluate_rules(comp1, comp2, rules)
                 if not result['compatible']:
                     issues.append({
                         'component1': comp1['name'],
@@ -103,52 +211,119 @@ class CompatibilityChecker:
             'warnings': warnings
         }
     
-    def _get_compatibility_rules(self, category1_slug: str, category2_slug: str) -> List[Dict]:
-        """Get compatibility rules between two categories"""
-        # Get category IDs
-        category_db = CategoryDB()
-        categories = category_db.get_all_categories()
-        category_map = {cat['slug']: cat['id'] for cat in categories}
-        
-        cat1_id = category_map.get(category1_slug)
-        cat2_id = category_map.get(category2_slug)
-        
-        if not cat1_id or not cat2_id:
-            return []
-        
-        # Get rules in both directions
-        rules = self.db.execute_query(
-            """SELECT * FROM pcbuilder_compatibilityrule 
-               WHERE (source_id = ? AND target_id = ?) 
-               OR (source_id = ? AND target_id = ?)""",
-            (cat1_id, cat2_id, cat2_id, cat1_id)
-        )
-        
-        return [json.loads(rule['condition']) for rule in rules]
+    def check_candidates(self, build_components: List[Dict], candidates: List[Dict]) -> List[Dict]:
+        """
+        Check many candidate components against a partial build in one pass.
+        Specs are parsed once per component, and the build components that
+        share rules with a category are worked out once per category.
+        Returns one {'component_id', 'compatible', 'status', 'messages'}
+        entry per candidate, in candidate order.
+        """
+        rule_table = get_rule_table()
+        build = [self._with_parsed_specs(comp) for comp in build_components]
+        relevant_by_category = {}
+        results = []
+        stored = {}
+        if self.use_matrix and build and candidates:
+            stored = self.matrix_db.get_pairs(
+                [candidate['id'] for candidate in candidates],
+                [comp['id'] for comp in build],
+                rule_table.version
+            )
+        
+        for candidate in candidates:
+            category = candidate['category_slug']
+            relevant = relevant_by_category.get(category)
+            if relevant is None:
+                relevant = relevant_by_category[category] = [
+                    (comp, rules) for comp in build
+                    for rules in [rule_table.rules_for(category, comp['category_slug'])]
+                    if rules
+                ]
+            
+            status = 'green'
+            messages = []
+            parsed = None
+            for comp, rules in relevant:
+                pair = stored.get((min(candidate['id'], comp['id']), max(candidate['id'], comp['id'])))
+                if pair:
+                    result = self._stored_result(pair)
+                else:
+                    if parsed is None:
+                        parsed = self._with_parsed_specs(candidate)
+                    result = self._evaluate_rules(parsed, comp, rules)
+                messages.append({
+                    'component_id': comp['id'],
+                    'component': comp['name'],
+                    'status': result['status'],
+                    'message': result['message'],
+                    'rule': result['rule']
+                })
+                if not result['compatible']:
+                    status = 'red'
+                elif result['status'] == 'yellow' and status == 'green':
+                    status = 'yellow'
+            
+            results.append({
+                'component_id': candidate['id'],
+                'compatible': status != 'red',
+                'status': status,
+                'messages': messages
+            })
+        
+        return results
     
-    def _check_rule(self, comp1: Dict, comp2: Dict, rule: Dict) -> Dict[str, any]:
-        """Check a specific compatibility rule"""
-        rule_type = rule.get('rule')
-        
-        if rule_type == 'socket_match':
-            return self._check_socket_match(comp1, comp2)
-        elif rule_type == 'gpu_length_fit':
-            return self._check_gpu_length_fit(comp1, comp2)
-        elif rule_type == 'cooler_height_fit':
-            return self._check_cooler_height_fit(comp1, comp2)
-        elif rule_type == 'psu_length_fit':
-            return self._check_psu_length_fit(comp1, comp2)
-        elif rule_type == 'power_requirement':
-            return self._check_power_requirement(comp1, comp2)
-        elif rule_type == 'form_factor_match':
-            return self._check_form_factor_match(comp1, comp2)
-        else:
-            return {
-                'compatible': True,
-                'status': 'green',
-                'message': f'Unknown rule type: {rule_type}',
-                'rule': rule_type
+    @staticmethod
+    def components_from_build_rows(build_rows: List[Dict]) -> List[Dict]:
+        """Turn BuildComponentDB.get_build_components() rows into component rows"""
+        return [
+            {
+                'id': row['component_id'],
+                'name': row['component_name'],
+                'price': row['component_price'],
+                'specs': row['component_specs'],
+                'category_slug': row['category_slug'],
+                'category_name': row['category_name'],
+                'vendor_name': row['vendor_name'],
             }
+            for row in build_rows
+        ]
+    
+    @staticmethod
+    def _stored_result(pair: Dict) -> Dict[str, any]:
+        """Result dict for a row of the precomputed compatibility matrix"""
+        return {
+            'compatible': bool(pair['compatible']),
+            'status': pair['status'],
+            'message': pair['message'],
+            'rule': pair['rule']
+        }
+    
+    def _evaluate_rules(self, comp1: Dict, comp2: Dict, rules: List[CompiledRule]) -> Dict[str, any]:
+        """Run every rule for a pair, stopping at the first failure"""
+        for rule in rules:
+            result = self._apply_rule(comp1, comp2, rule)
+            if not result['compatible']:
+                return result
+        
+        return {
+            'compatible': True,
+            'status': 'green',
+            'message': 'All compatibility checks passed',
+            'rule': 'all_passed'
+        }
+    
+    def _specs(self, comp: Dict) -> SpecRecord:
+        """Typed specs for a component, from the row itself or the shared spec cache"""
+        record = comp.get('spec_record')
+        return record if record is not None else spec_cache.get(comp)
+    
+    def _with_parsed_specs(self, comp: Dict) -> Dict:
+        return {**comp, 'spec_record': spec_cache.get(comp)}
+    
+    def _apply_rule(self, comp1: Dict, comp2: Dict, rule: CompiledRule) -> Dict[str, any]:
+        """Run a precompiled rule's handler"""
+        return rule.handler(self, comp1, comp2)
     
     def _check_socket_match(self, comp1: Dict, comp2: Dict) -> Dict[str, any]:
         """Check if CPU and motherboard sockets match"""
@@ -178,11 +353,11 @@ class CompatibilityChecker:
                 'rule': 'socket_match'
             }
         
-        cpu_specs = json.loads(cpu['specs'])
-        mb_specs = json.loads(motherboard['specs'])
+        cpu_specs = self._specs(cpu)
+        mb_specs = self._specs(motherboard)
         
-        cpu_socket = cpu_specs.get('socket')
-        mb_socket = mb_specs.get('socket')
+        cpu_socket = cpu_specs.socket
+        mb_socket = mb_specs.socket
         
         if cpu_socket == mb_socket:
             return {
@@ -227,11 +402,11 @@ class CompatibilityChecker:
                 'rule': 'gpu_length_fit'
             }
         
-        gpu_specs = json.loads(gpu['specs'])
-        case_specs = json.loads(case['specs'])
+        gpu_specs = self._specs(gpu)
+        case_specs = self._specs(case)
         
-        gpu_length = gpu_specs.get('length', 0)
-        case_max_gpu = case_specs.get('max_gpu_length', 0)
+        gpu_length = gpu_specs.length
+        case_max_gpu = case_specs.max_gpu_length
         
         if gpu_length <= case_max_gpu:
             return {
@@ -276,11 +451,11 @@ class CompatibilityChecker:
                 'rule': 'cooler_height_fit'
             }
         
-        cooler_specs = json.loads(cooler['specs'])
-        case_specs = json.loads(case['specs'])
+        cooler_specs = self._specs(cooler)
+        case_specs = self._specs(case)
         
-        cooler_height = cooler_specs.get('height', 0)
-        case_max_cooler = case_specs.get('max_cpu_cooler_height', 0)
+        cooler_height = cooler_specs.height
+        case_max_cooler = case_specs.max_cpu_cooler_height
         
         if cooler_height <= case_max_cooler:
             return {
@@ -362,11 +537,11 @@ class CompatibilityChecker:
                 'rule': 'power_requirement'
             }
         
-        gpu_specs = json.loads(gpu['specs'])
-        psu_specs = json.loads(psu['specs'])
+        gpu_specs = self._specs(gpu)
+        psu_specs = self._specs(psu)
         
-        gpu_tdp = gpu_specs.get('tdp', 0)
-        psu_wattage = psu_specs.get('wattage', 0)
+        gpu_tdp = gpu_specs.tdp
+        psu_wattage = psu_specs.wattage
         
         # Simple rule: PSU should be at least 1.5x GPU TDP for headroom
         required_wattage = gpu_tdp * 1.5
@@ -414,11 +589,11 @@ class CompatibilityChecker:
                 'rule': 'form_factor_match'
             }
         
-        mb_specs = json.loads(motherboard['specs'])
-        case_specs = json.loads(case['specs'])
+        mb_specs = self._specs(motherboard)
+        case_specs = self._specs(case)
         
-        mb_form_factor = mb_specs.get('form_factor', 'ATX')
-        case_form_factor = case_specs.get('form_factor', 'ATX')
+        mb_form_factor = mb_specs.form_factor
+        case_form_factor = case_specs.form_factor
         
         # ATX cases support ATX and smaller (mATX, ITX)
         # mATX cases support mATX and smaller (ITX)
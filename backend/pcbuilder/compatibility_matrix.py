@@ -0,0 +1,109 @@
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.db import transaction
+
+from .compatibility_checker import CompatibilityChecker, get_rule_table
+from .database import CompatibilityMatrixDB, ComponentDB
+
+
+class CompatibilityMatrix:
+    """
+    Precomputes the compatibility of every component pair whose categories
+    share a rule and stores it in pcbuilder_compatibilitymatrix, so that
+    CompatibilityChecker can answer from a single indexed lookup.
+
+    rebuild() recomputes everything (run it from the
+    build_compatibility_matrix command after rules change);
+    refresh_component() recomputes the pairs of one added or edited part.
+    """
+    def __init__(self, batch_size: int = 5000):
+        self.batch_size = batch_size
+        self.checker = CompatibilityChecker()
+        self.component_db = ComponentDB()
+        self.matrix_db = CompatibilityMatrixDB()
+
+    def _category_pairs(self) -> List[tuple]:
+        """Unordered category slug pairs that have at least one rule"""
+        seen = set()
+        pairs = []
+        for pair in get_rule_table().rules:
+            key = frozenset(pair)
+            if key not in seen:
+                seen.add(key)
+                pairs.append(pair)
+        return pairs
+
+    def _evaluate(self, comp1: Dict, comp2: Dict, rules, rules_version: int) -> tuple:
+        if comp1['id'] > comp2['id']:
+            comp1, comp2 = comp2, comp1
+        result = self.checker._evaluate_rules(comp1, comp2, rules)
+        return (comp1['id'], comp2['id'], rules_version, result['compatible'],
+                result['status'], result['rule'], result['message'])
+
+    def _rows(self, components: List[Dict], others: List[Dict], rules, rules_version: int) -> Iterator[tuple]:
+        for comp in components:
+            for other in others:
+                if comp['id'] != other['id']:
+                    yield self._evaluate(comp, other, rules, rules_version)
+
+    def _save(self, rows: Iterator[tuple]) -> int:
+        saved = 0
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                saved += self.matrix_db.save_pairs(batch)
+                batch = []
+        if batch:
+            saved += self.matrix_db.save_pairs(batch)
+        return saved
+
+    def _load_category(self, slug: str, cache: Dict[str, List[Dict]]) -> List[Dict]:
+        if slug not in cache:
+            cache[slug] = [
+                self.checker._with_parsed_specs(comp)
+                for comp in self.component_db.get_components_by_category(slug)
+            ]
+        return cache[slug]
+
+    def rebuild(self, progress: Optional[Callable[[str, str, int], None]] = None) -> int:
+        """Recompute every pair under the current rules; returns the number of pairs stored"""
+        rule_table = get_rule_table()
+        self.matrix_db.clear()
+        components = {}
+        total = 0
+        for slug_a, slug_b in self._category_pairs():
+            rules = rule_table.rules_for(slug_a, slug_b)
+            comps_a = self._load_category(slug_a, components)
+            comps_b = self._load_category(slug_b, components)
+            saved = self._save(self._rows(comps_a, comps_b, rules, rule_table.version))
+            total += saved
+            if progress:
+                progress(slug_a, slug_b, saved)
+        return total
+
+    def refresh_component(self, component_id: int) -> int:
+        """Recompute the pairs of one component; returns the number of pairs stored"""
+        rule_table = get_rule_table()
+        self.matrix_db.delete_component(component_id)
+        component = self.component_db.get_component_by_id(component_id)
+        if not component:
+            return 0
+        component = self.checker._with_parsed_specs(component)
+        slug = component['category_slug']
+        components = {}
+        total = 0
+        for slug_a, slug_b in self._category_pairs():
+            if slug not in (slug_a, slug_b):
+                continue
+            other_slug = slug_b if slug == slug_a else slug_a
+            rules = rule_table.rules_for(slug_a, slug_b)
+            others = self._load_category(other_slug, components)
+            total += self._save(self._rows([component], others, rules, rule_table.version))
+        return total
+
+
+def refresh_component_pairs(sender=None, instance=None, **kwargs):
+    """post_save receiver for Component; runs once the admin's transaction commits"""
+    component_id = instance.pk
+    transaction.on_commit(lambda: CompatibilityMatrix().refresh_component(component_id))
@@ -0,0 +1,61 @@
+from functools import wraps
+from hashlib import sha1
+from typing import Optional
+
+from django.utils.http import parse_etags
+from rest_framework.response import Response
+
+
+def make_etag(request, *parts) -> str:
+    """
+    Strong ETag over whatever determines a response's content. The rendered
+    format is always part of it, since JSON and the browsable API differ.
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    parts += (getattr(renderer, 'format', None),)
+    return '"%s"' % sha1(repr(parts).encode()).hexdigest()
+
+
+def not_modified(request, etag: str) -> Optional[Response]:
+    """A 304 response when the request's If-None-Match matches `etag`, else None"""
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return None
+    # If-None-Match uses weak comparison, so W/ prefixes added on the way
+    # (e.g. by GZipMiddleware) still match
+    candidates = [tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(header)]
+    if '*' in candidates or etag in candidates:
+        response = Response(status=304)
+        response['ETag'] = etag
+        return response
+    return None
+
+
+def with_etag(response: Response, etag: str) -> Response:
+    response['ETag'] = etag
+    return response
+
+
+def conditional(etag_parts):
+    """
+    Decorator for view methods answering conditional GETs. `etag_parts(view,
+    request, *args, **kwargs)` returns what the response depends on (or None
+    to skip the check); a matching If-None-Match gets a 304 before the view
+    runs any joins or serialization.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, request, *args, **kwargs):
+            parts = etag_parts(self, request, *args, **kwargs)
+            if parts is None:
+                return method(self, request, *args, **kwargs)
+            etag = make_etag(request, *parts)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+            response = method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                with_etag(response, etag)
+            return response
+        return wrapper
+    return decorator
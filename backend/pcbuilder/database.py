@@ -1,44 +1,267 @@
 import sqlite3
 import json
+import re
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from itertools import groupby
 from typing import List, Dict, Any, Optional
 from django.conf import settings
-import os
 from django.contrib.auth.hashers import make_password, check_password
 from datetime import datetime
+from .identity_map import forget, remember
+
+class ConnectionPool:
+    """
+    Reuses SQLite connections instead of opening a new one for every query.
+
+    A thread keeps the connection it acquired until release() is called
+    (at the end of each request), at which point the connection goes back
+    to the idle list for the next thread. At most `size` idle connections
+    are kept around; any extra ones are closed.
+
+    `pragmas` are applied once to every new connection (see SQLITE_PRAGMAS).
+    """
+    def __init__(self, db_path: str, size: int = 5, health_check_interval: float = 30.0,
+                 pragmas: Optional[Dict[str, Any]] = None):
+        self.db_path = db_path
+        self.size = size
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas or {}
+        self._idle = []  # (connection, last_checked) pairs
+        self._connections = set()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Connections move between threads through the idle list, but only
+        # one thread ever uses a given connection at a time
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # This allows accessing columns by name
+        self._configure(conn)
+        with self._lock:
+            self._connections.add(conn)
+        return conn
+    
+    def _configure(self, conn: sqlite3.Connection):
+        """Apply the connection profile, e.g. journal_mode=WAL, synchronous=NORMAL"""
+        for name, value in self.pragmas.items():
+            if not str(name).isidentifier():
+                raise ValueError(f"Invalid SQLite pragma name: {name!r}")
+            if isinstance(value, str) and not value.replace('-', '').isalnum():
+                raise ValueError(f"Invalid value for SQLite pragma {name}: {value!r}")
+            conn.execute(f"PRAGMA {name} = {value}")
+    
+    def _discard(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._connections.discard(conn)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _usable(self, conn: sqlite3.Connection) -> bool:
+        """Health-check the current thread's connection when a check is due"""
+        now = time.monotonic()
+        if now - self._local.checked_at < self.health_check_interval:
+            return True
+        if self._is_healthy(conn):
+            self._local.checked_at = now
+            return True
+        self._discard(conn)
+        return False
+    
+    def acquire(self) -> sqlite3.Connection:
+        """Get the connection bound to the current thread, checking one out if needed"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._usable(conn):
+            return conn
+        
+        self._local.conn = None
+        while self._local.conn is None:
+            with self._lock:
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._local.conn, self._local.checked_at = self._connect(), time.monotonic()
+            else:
+                conn, self._local.checked_at = entry
+                if self._usable(conn):
+                    self._local.conn = conn
+        return self._local.conn
+    
+    def release(self):
+        """Hand the current thread's connection back to the idle list"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        self._local.transaction_depth = 0
+        checked_at = self._local.checked_at
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((conn, checked_at))
+                return
+        self._discard(conn)
+    
+    def close_all(self):
+        """Close every connection owned by this pool"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+            self._idle = []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        self._local = threading.local()
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str) -> ConnectionPool:
+    """Get the shared pool for a database file, creating it on first use"""
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = ConnectionPool(
+                    db_path,
+                    size=getattr(settings, 'SQLITE_POOL_SIZE', 5),
+                    health_check_interval=getattr(settings, 'SQLITE_POOL_HEALTH_CHECK_INTERVAL', 30.0),
+                    pragmas=getattr(settings, 'SQLITE_PRAGMAS', {}),
+                )
+                _pools[db_path] = pool
+    return pool
+
+def release_connections(**kwargs):
+    """Return the current thread's connections to their pools (request_finished receiver)"""
+    for pool in list(_pools.values()):
+        pool.release()
+
+@atexit.register
+def close_all_pools():
+    """Close all pooled connections, e.g. when a worker shuts down"""
+    for pool in list(_pools.values()):
+        pool.close_all()
+
+def keyset_clause(columns: List[str], after: Optional[tuple] = None, before: Optional[tuple] = None,
+                  descending: bool = False):
+    """
+    Build the keyset condition and ORDER BY for one page of a list query.
+
+    Rows are sorted by `columns` (all ascending or all descending). `after`
+    selects the rows following that key; `before` selects the rows preceding
+    it, ordered from the nearest one, so the caller has to reverse them.
+    Returns (condition or None, order_by, params).
+    """
+    key = f"({', '.join(columns)})"
+    placeholders = f"({', '.join('?' * len(columns))})"
+    backwards = before is not None
+    direction = 'DESC' if descending != backwards else 'ASC'
+    order_by = ', '.join(f"{column} {direction}" for column in columns)
+    
+    bound = before if backwards else after
+    if bound is None:
+        return None, order_by, ()
+    operator = '<' if direction == 'DESC' else '>'
+    return f"{key} {operator} {placeholders}", order_by, tuple(bound)
 
 class DatabaseManager:
     def __init__(self):
-        self.db_path = os.path.join(settings.BASE_DIR, 'db.sqlite3')
+        # The file Django uses too; the test runner points it at the test database
+        self.db_path = str(settings.DATABASES['default']['NAME'])
+        self.pool = get_pool(self.db_path)
     
     def get_connection(self):
-        """Get a database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # This allows accessing columns by name
-        return conn
+        """Get the pooled database connection for the current thread"""
+        return self.pool.acquire()
     
-    def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
-        """Execute a SELECT query and return results as list of dictionaries"""
-        with self.get_connection() as conn:
+    def in_transaction(self) -> bool:
+        """Whether the current thread is inside a transaction() block"""
+        return getattr(self.pool._local, 'transaction_depth', 0) > 0
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Unit of work: every execute_* call made by this thread inside the
+        block, through any *DB class, runs in one BEGIN IMMEDIATE transaction
+        that is committed when the block exits and rolled back if it raises.
+        IMMEDIATE takes the write lock up front, so read-modify-write
+        statements inside cannot interleave with another writer. Nested
+        blocks join the outer transaction.
+        """
+        conn = self.get_connection()
+        local = self.pool._local
+        if self.in_transaction():
+            local.transaction_depth += 1
+            try:
+                yield conn
+            finally:
+                local.transaction_depth -= 1
+            return
+        
+        conn.execute("BEGIN IMMEDIATE")
+        local.transaction_depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            local.transaction_depth = 0
+    
+    def _execute(self, query: str, params: tuple, result, commit: bool):
+        conn = self.get_connection()
+        if self.in_transaction():
+            # Part of a unit of work; transaction() commits or rolls back
+            return result(conn.execute(query, params))
+        with conn:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
+            value = result(cursor)
+            if commit:
+                conn.commit()
+            return value
+    
+    def execute_query(self, query: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        """Execute a SELECT query and return results as list of dictionaries"""
+        return self._execute(query, params, lambda cursor: [dict(row) for row in cursor.fetchall()], commit=False)
     
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """Execute an INSERT, UPDATE, or DELETE query and return affected rows"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount
+        return self._execute(query, params, lambda cursor: cursor.rowcount, commit=True)
     
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """Execute an INSERT query and return the last inserted ID"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
+        return self._execute(query, params, lambda cursor: cursor.lastrowid, commit=True)
+
+    def execute_many(self, query: str, params_seq) -> int:
+        """Execute one INSERT, UPDATE, or DELETE for every params tuple and return affected rows"""
+        conn = self.get_connection()
+        if self.in_transaction():
+            return conn.executemany(query, params_seq).rowcount
+        with conn:
+            cursor = conn.executemany(query, params_seq)
             conn.commit()
-            return cursor.lastrowid
+            return cursor.rowcount
 
 # User operations
 class UserDB:
@@ -53,6 +276,20 @@ class UserDB:
         """
         return self.db.execute_query(query)
     
+    def get_users_page(self, limit: int, after: Optional[tuple] = None,
+                       before: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """One keyset page of users ordered by id (see KeysetPaginator)"""
+        condition, order_by, params = keyset_clause(['id'], after, before)
+        query = f"""
+        SELECT id, username, email, bio, avatar, is_pro_builder, 
+               is_superuser, is_staff, is_active, date_joined
+        FROM pcbuilder_user
+        {'WHERE ' + condition if condition else ''}
+        ORDER BY {order_by}
+        LIMIT ?
+        """
+        return self.db.execute_query(query, params + (limit,))
+    
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         query = """
         SELECT id, username, email, bio, avatar, is_pro_builder, 
@@ -60,8 +297,10 @@ class UserDB:
         FROM pcbuilder_user
         WHERE id = ?
         """
-        results = self.db.execute_query(query, (user_id,))
-        return results[0] if results else None
+        def load():
+            results = self.db.execute_query(query, (user_id,))
+            return results[0] if results else None
+        return remember('pcbuilder_user', user_id, load)
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         query = """
@@ -136,9 +375,80 @@ class VendorDB:
 
 # Component operations
 class ComponentDB:
+    # Catalog filters: name -> (SQL expression, kind). 'values' filters match
+    # one of several values and facet into value counts; 'range' filters take
+    # a min and/or max and facet into the min/max present. The spec
+    # expressions match the indexes created in migration 0008.
+    FILTERS = {
+        'socket': ("json_extract(c.specs, '$.socket')", 'values'),
+        'form_factor': ("json_extract(c.specs, '$.form_factor')", 'values'),
+        'wattage': ("json_extract(c.specs, '$.wattage')", 'range'),
+        'length': ("json_extract(c.specs, '$.length')", 'range'),
+        'tdp': ("json_extract(c.specs, '$.tdp')", 'range'),
+        'price': ("c.price", 'range'),
+    }
+    
     def __init__(self):
         self.db = DatabaseManager()
     
+    def _filter_conditions(self, filters: Optional[Dict[str, Any]], exclude: Optional[str] = None):
+        """
+        SQL conditions for {name: [values]} / {name: (min, max)} filters.
+        `exclude` leaves one filter out, for computing that filter's facet.
+        """
+        conditions = []
+        params = ()
+        for name, value in (filters or {}).items():
+            if name == exclude:
+                continue
+            expression, kind = self.FILTERS[name]
+            if kind == 'values':
+                conditions.append(f"{expression} IN ({', '.join('?' * len(value))})")
+                params += tuple(value)
+            else:
+                minimum, maximum = value
+                if minimum is not None:
+                    conditions.append(f"{expression} >= ?")
+                    params += (minimum,)
+                if maximum is not None:
+                    conditions.append(f"{expression} <= ?")
+                    params += (maximum,)
+        return conditions, params
+    
+    def get_facets(self, category_slug: Optional[str] = None,
+                   filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Facet counts for every filter, each computed with the other filters
+        applied: value counts for 'values' filters, min/max/count for ranges.
+        """
+        facets = {}
+        for name, (expression, kind) in self.FILTERS.items():
+            conditions, params = self._filter_conditions(filters, exclude=name)
+            if category_slug is not None:
+                conditions.append("cat.slug = ?")
+                params += (category_slug,)
+            conditions.append(f"{expression} IS NOT NULL")
+            where = ' AND '.join(conditions)
+            if kind == 'values':
+                query = f"""
+                SELECT {expression} as value, COUNT(*) as count
+                FROM pcbuilder_component c
+                JOIN pcbuilder_category cat ON c.category_id = cat.id
+                WHERE {where}
+                GROUP BY value
+                ORDER BY count DESC, value
+                """
+                facets[name] = self.db.execute_query(query, params)
+            else:
+                query = f"""
+                SELECT MIN({expression}) as min, MAX({expression}) as max, COUNT(*) as count
+                FROM pcbuilder_component c
+                JOIN pcbuilder_category cat ON c.category_id = cat.id
+                WHERE {where}
+                """
+                facets[name] = self.db.execute_query(query, params)[0]
+        return facets
+    
     def get_all_components(self) -> List[Dict[str, Any]]:
         query = """
         SELECT 
@@ -152,6 +462,48 @@ class ComponentDB:
         """
         return self.db.execute_query(query)
     
+    def get_components_page(self, limit: int, after: Optional[tuple] = None,
+                            before: Optional[tuple] = None,
+                            category_slug: Optional[str] = None,
+                            filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        One keyset page of components ordered by (category, price, id),
+        optionally narrowed by category and FILTERS (see _filter_conditions)
+        """
+        condition, order_by, params = keyset_clause(
+            ['c.category_id', 'c.price', 'c.id'], after, before
+        )
+        conditions = [condition] if condition else []
+        if category_slug is not None:
+            conditions.append("cat.slug = ?")
+            params = params + (category_slug,)
+        filter_conditions, filter_params = self._filter_conditions(filters)
+        conditions += filter_conditions
+        params = params + filter_params
+        query = f"""
+        SELECT 
+            c.id, c.name, c.description, c.price, c.image, 
+            c.specs, c.stock, c.category_id, c.vendor_id,
+            cat.name as category_name, cat.slug as category_slug,
+            v.name as vendor_name, v.website as vendor_website
+        FROM pcbuilder_component c
+        JOIN pcbuilder_category cat ON c.category_id = cat.id
+        JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY {order_by}
+        LIMIT ?
+        """
+        return self.db.execute_query(query, params + (limit,))
+    
+    def get_component_names(self) -> List[Dict[str, Any]]:
+        """Just what the autocomplete index needs, without specs and descriptions"""
+        query = """
+        SELECT c.id, c.name, cat.slug as category_slug
+        FROM pcbuilder_component c
+        JOIN pcbuilder_category cat ON c.category_id = cat.id
+        """
+        return self.db.execute_query(query)
+    
     def get_component_by_id(self, component_id: int) -> Optional[Dict[str, Any]]:
         query = """
         SELECT 
@@ -164,8 +516,32 @@ class ComponentDB:
         JOIN pcbuilder_vendor v ON c.vendor_id = v.id
         WHERE c.id = ?
         """
-        results = self.db.execute_query(query, (component_id,))
-        return results[0] if results else None
+        def load():
+            results = self.db.execute_query(query, (component_id,))
+            return results[0] if results else None
+        return remember('pcbuilder_component', component_id, load)
+    
+    def get_components_by_ids(self, component_ids: List[int]) -> List[Dict[str, Any]]:
+        """Components among component_ids, in the order the ids were given"""
+        components = {}
+        ids = list(dict.fromkeys(component_ids))
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            query = f"""
+            SELECT 
+                c.id, c.name, c.description, c.price, c.image, 
+                c.specs, c.stock, c.category_id, c.vendor_id,
+                cat.name as category_name, cat.slug as category_slug,
+                v.name as vendor_name, v.website as vendor_website
+            FROM pcbuilder_component c
+            JOIN pcbuilder_category cat ON c.category_id = cat.id
+            JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+            WHERE c.id IN ({placeholders})
+            """
+            for row in self.db.execute_query(query, tuple(chunk)):
+                components[row['id']] = row
+        return [components[component_id] for component_id in ids if component_id in components]
     
     def get_components_by_category(self, category_slug: str) -> List[Dict[str, Any]]:
         query = """
@@ -181,19 +557,67 @@ class ComponentDB:
         """
         return self.db.execute_query(query, (category_slug,))
     
+    @staticmethod
+    def build_match_query(search_term: str) -> Optional[str]:
+        """Turn free text into an FTS5 query: every word must match, as a prefix"""
+        words = re.findall(r'\w+', search_term or '')
+        if not words:
+            return None
+        return ' '.join(f'"{word}"*' for word in words)
+    
     def search_components(self, search_term: str) -> List[Dict[str, Any]]:
+        """All components matching search_term, best match first"""
+        match = self.build_match_query(search_term)
+        if match is None:
+            return []
         query = """
         SELECT 
             c.id, c.name, c.description, c.price, c.image, 
             c.specs, c.stock, c.category_id, c.vendor_id,
             cat.name as category_name, cat.slug as category_slug,
             v.name as vendor_name, v.website as vendor_website
-        FROM pcbuilder_component c
+        FROM pcbuilder_component_fts fts
+        JOIN pcbuilder_component c ON c.id = fts.rowid
         JOIN pcbuilder_category cat ON c.category_id = cat.id
         JOIN pcbuilder_vendor v ON c.vendor_id = v.id
-        WHERE LOWER(c.name) LIKE LOWER('%' || ? || '%')
+        WHERE pcbuilder_component_fts MATCH ?
+        ORDER BY bm25(pcbuilder_component_fts, 10.0, 1.0, 5.0, 2.0), c.id
+        """
+        return self.db.execute_query(query, (match,))
+    
+    def search_components_page(self, search_term: str, limit: int, after: Optional[tuple] = None,
+                               before: Optional[tuple] = None,
+                               category_slug: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        One keyset page of full-text search results ordered by (rank, id).
+        rank is the BM25 score (lower is better) with name weighted highest,
+        then vendor, specs and description.
+        """
+        match = self.build_match_query(search_term)
+        if match is None:
+            return []
+        condition, order_by, params = keyset_clause(['rank', 'id'], after, before)
+        category_filter = "AND cat.slug = ?" if category_slug is not None else ""
+        query = f"""
+        SELECT * FROM (
+            SELECT 
+                c.id, c.name, c.description, c.price, c.image, 
+                c.specs, c.stock, c.category_id, c.vendor_id,
+                cat.name as category_name, cat.slug as category_slug,
+                v.name as vendor_name, v.website as vendor_website,
+                bm25(pcbuilder_component_fts, 10.0, 1.0, 5.0, 2.0) as rank
+            FROM pcbuilder_component_fts fts
+            JOIN pcbuilder_component c ON c.id = fts.rowid
+            JOIN pcbuilder_category cat ON c.category_id = cat.id
+            JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+            WHERE pcbuilder_component_fts MATCH ? {category_filter}
+        )
+        {'WHERE ' + condition if condition else ''}
+        ORDER BY {order_by}
+        LIMIT ?
         """
-        return self.db.execute_query(query, (search_term,))
+        query_params = (match,) + ((category_slug,) if category_slug is not None else ())
+        return self.db.execute_query(query, query_params + params + (limit,))
     
     def get_components_by_price_range(self, min_price: float, max_price: float) -> List[Dict[str, Any]]:
         query = """
@@ -233,8 +657,10 @@ class BuildDB:
         FROM pcbuilder_build 
         WHERE id = ?
         """
-        results = self.db.execute_query(query, (build_id,))
-        return results[0] if results else None
+        def load():
+            results = self.db.execute_query(query, (build_id,))
+            return results[0] if results else None
+        return remember('pcbuilder_build', build_id, load)
     
     def create_build(self, user_id: int, name: str, description: str = "", is_public: bool = True) -> int:
         current_time = datetime.now().isoformat()
@@ -268,15 +694,19 @@ class BuildDB:
         params.append(build_id)
         query = f"UPDATE pcbuilder_build SET {', '.join(update_parts)} WHERE id = ?"
         
+        forget('pcbuilder_build', build_id)
         return self.db.execute_update(query, tuple(params)) > 0
     
     def delete_build(self, build_id: int) -> bool:
-        # First delete all build components
-        self.db.execute_update("DELETE FROM pcbuilder_buildcomponent WHERE build_id = ?", (build_id,))
-        # Then delete the build
-        return self.db.execute_update("DELETE FROM pcbuilder_build WHERE id = ?", (build_id,)) > 0
+        forget('pcbuilder_build', build_id)
+        with self.db.transaction():
+            # First delete all build components
+            self.db.execute_update("DELETE FROM pcbuilder_buildcomponent WHERE build_id = ?", (build_id,))
+            # Then delete the build
+            return self.db.execute_update("DELETE FROM pcbuilder_build WHERE id = ?", (build_id,)) > 0
     
     def update_build_total_price(self, build_id: int) -> bool:
+        """Recompute the total after the components changed; also marks the build updated"""
         query = """
         UPDATE pcbuilder_build 
         SET total_price = (
@@ -284,10 +714,38 @@ class BuildDB:
             FROM pcbuilder_buildcomponent bc
             JOIN pcbuilder_component c ON bc.component_id = c.id
             WHERE bc.build_id = ?
-        )
+        ), updated = ?
         WHERE id = ?
         """
-        return self.db.execute_update(query, (build_id, build_id)) > 0
+        forget('pcbuilder_build', build_id)
+        return self.db.execute_update(query, (build_id, datetime.now().isoformat(), build_id)) > 0
+
+    def update_total_prices_for_components(self, component_ids: List[int]) -> int:
+        """
+        Recompute the totals of the builds containing any of these components,
+        after their catalog prices changed. The builds themselves were not
+        edited, so `updated` is left alone; their ETags follow the catalog
+        version instead. Returns the number of builds updated.
+        """
+        query = """
+        UPDATE pcbuilder_build
+        SET total_price = (
+            SELECT COALESCE(SUM(c.price * bc.quantity), 0.00)
+            FROM pcbuilder_buildcomponent bc
+            JOIN pcbuilder_component c ON bc.component_id = c.id
+            WHERE bc.build_id = pcbuilder_build.id
+        )
+        WHERE id IN (SELECT build_id FROM pcbuilder_buildcomponent WHERE component_id IN ({placeholders}))
+        """
+        updated = 0
+        ids = sorted(set(component_ids))
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            updated += self.db.execute_update(query.format(placeholders=', '.join('?' * len(chunk))), tuple(chunk))
+        if updated:
+            forget('pcbuilder_build')
+        return updated
 
 # Build Component operations
 class BuildComponentDB:
@@ -310,21 +768,154 @@ class BuildComponentDB:
         """
         return self.db.execute_query(query, (build_id,))
     
+    def get_components_for_builds(self, build_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Fetch the components of many builds at once and group them by build id.
+        Every requested id is present in the result, with [] for empty builds.
+        """
+        grouped = {build_id: [] for build_id in build_ids}
+        ids = list(grouped)
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            query = f"""
+            SELECT 
+                bc.id, bc.build_id, bc.component_id, bc.quantity, bc.notes,
+                c.name as component_name, c.description as component_description, c.price as component_price, 
+                c.image as component_image, c.specs as component_specs, c.stock as component_stock,
+                cat.name as category_name, cat.slug as category_slug,
+                v.name as vendor_name, v.website as vendor_website
+            FROM pcbuilder_buildcomponent bc
+            JOIN pcbuilder_component c ON bc.component_id = c.id
+            JOIN pcbuilder_category cat ON c.category_id = cat.id
+            JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+            WHERE bc.build_id IN ({placeholders})
+            ORDER BY bc.build_id, bc.id
+            """
+            for row in self.db.execute_query(query, tuple(chunk)):
+                grouped[row['build_id']].append(row)
+        return grouped
+    
+    def _get_line(self, build_id: int, component_id: int) -> Optional[Dict[str, Any]]:
+        query = """
+        SELECT c.price, bc.quantity
+        FROM pcbuilder_buildcomponent bc
+        JOIN pcbuilder_component c ON bc.component_id = c.id
+        WHERE bc.build_id = ? AND bc.component_id = ?
+        """
+        results = self.db.execute_query(query, (build_id, component_id))
+        return results[0] if results else None
+    
+    def _adjust_total(self, build_id: int, delta: float):
+        """Add ±price × quantity to the build total instead of re-summing the build"""
+        forget('pcbuilder_build', build_id)
+        query = """
+        UPDATE pcbuilder_build
+        SET total_price = ROUND(COALESCE(total_price, 0) + ?, 2), updated = ?
+        WHERE id = ?
+        """
+        self.db.execute_update(query, (delta, datetime.now().isoformat(), build_id))
+    
     def add_component_to_build(self, build_id: int, component_id: int, quantity: int = 1, notes: str = "") -> int:
+        """Insert a component and add it to the build total, in one transaction"""
         query = """
         INSERT INTO pcbuilder_buildcomponent (
             build_id, component_id, quantity, notes
         ) VALUES (?, ?, ?, ?)
         """
-        return self.db.execute_insert(query, (build_id, component_id, quantity, notes))
+        with self.db.transaction():
+            build_component_id = self.db.execute_insert(query, (build_id, component_id, quantity, notes))
+            price = self.db.execute_query("SELECT price FROM pcbuilder_component WHERE id = ?", (component_id,))
+            if price:
+                self._adjust_total(build_id, price[0]['price'] * quantity)
+            return build_component_id
     
     def remove_component_from_build(self, build_id: int, component_id: int) -> bool:
+        """Delete a component and take it off the build total, in one transaction"""
         query = "DELETE FROM pcbuilder_buildcomponent WHERE build_id = ? AND component_id = ?"
-        return self.db.execute_update(query, (build_id, component_id)) > 0
+        with self.db.transaction():
+            line = self._get_line(build_id, component_id)
+            if not line:
+                return False
+            self.db.execute_update(query, (build_id, component_id))
+            self._adjust_total(build_id, -line['price'] * line['quantity'])
+            return True
     
     def update_component_quantity(self, build_id: int, component_id: int, quantity: int) -> bool:
+        """Change a quantity and apply the difference to the build total, in one transaction"""
         query = "UPDATE pcbuilder_buildcomponent SET quantity = ? WHERE build_id = ? AND component_id = ?"
-        return self.db.execute_update(query, (quantity, build_id, component_id)) > 0
+        with self.db.transaction():
+            line = self._get_line(build_id, component_id)
+            if not line:
+                return False
+            self.db.execute_update(query, (quantity, build_id, component_id))
+            self._adjust_total(build_id, line['price'] * (quantity - line['quantity']))
+            return True
+
+    BULK_QUERIES = {
+        'add': """
+        INSERT INTO pcbuilder_buildcomponent (
+            build_id, component_id, quantity, notes
+        ) VALUES (?, ?, ?, ?)
+        """,
+        'remove': "DELETE FROM pcbuilder_buildcomponent WHERE build_id = ? AND component_id = ?",
+        'quantity': "UPDATE pcbuilder_buildcomponent SET quantity = ? WHERE build_id = ? AND component_id = ?",
+    }
+
+    def _validate_operations(self, build_id: int, operations: List[Dict[str, Any]]) -> List[str]:
+        """Replay the operations against the build's current lines and describe any that would fail"""
+        lines = {row['component_id'] for row in self.db.execute_query(
+            "SELECT component_id FROM pcbuilder_buildcomponent WHERE build_id = ?", (build_id,)
+        )}
+        added = sorted({op['component_id'] for op in operations if op['op'] == 'add'})
+        existing = set()
+        for start in range(0, len(added), 500):
+            chunk = added[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            existing.update(row['id'] for row in self.db.execute_query(
+                f"SELECT id FROM pcbuilder_component WHERE id IN ({placeholders})", tuple(chunk)
+            ))
+
+        errors = []
+        for index, op in enumerate(operations):
+            component_id = op['component_id']
+            if op['op'] == 'add':
+                if component_id not in existing:
+                    errors.append(f"Operation {index}: component {component_id} does not exist")
+                elif component_id in lines:
+                    errors.append(f"Operation {index}: component {component_id} is already in the build")
+                lines.add(component_id)
+            elif component_id not in lines:
+                errors.append(f"Operation {index}: component {component_id} is not in the build")
+            elif op['op'] == 'remove':
+                lines.discard(component_id)
+        return errors
+
+    def apply_operations(self, build_id: int, operations: List[Dict[str, Any]]) -> List[str]:
+        """
+        Apply a list of {'op': 'add'|'remove'|'quantity', 'component_id', 'quantity', 'notes'}
+        changes in one transaction and recompute the build total once.
+
+        Consecutive operations of the same kind go to SQLite as one executemany,
+        in the order given. Nothing is written if any operation would fail; the
+        problems are returned instead, and an empty list means success.
+        """
+        with self.db.transaction():
+            errors = self._validate_operations(build_id, operations)
+            if errors:
+                return errors
+            for kind, run in groupby(operations, key=lambda op: op['op']):
+                if kind == 'add':
+                    params = [(build_id, op['component_id'], op.get('quantity', 1), op.get('notes', ''))
+                              for op in run]
+                elif kind == 'remove':
+                    params = [(build_id, op['component_id']) for op in run]
+                else:
+                    params = [(op['quantity'], build_id, op['component_id']) for op in run]
+                self.db.execute_many(self.BULK_QUERIES[kind], params)
+            BuildDB().update_build_total_price(build_id)
+            return []
 
 # Public builds operations
 class PublicBuildDB:
@@ -344,6 +935,69 @@ class PublicBuildDB:
         """
         return self.db.execute_query(query)
     
+    def get_public_builds_page(self, limit: int, after: Optional[tuple] = None,
+                               before: Optional[tuple] = None) -> List[Dict[str, Any]]:
+        """One keyset page of public builds, newest first by (created, id)"""
+        condition, order_by, params = keyset_clause(
+            ['b.created', 'b.id'], after, before, descending=True
+        )
+        query = f"""
+        SELECT 
+            b.id, b.user_id, b.name, b.description, b.created, 
+            b.updated, b.is_public, b.total_price,
+            u.username as user_username
+        FROM pcbuilder_build b
+        JOIN pcbuilder_user u ON b.user_id = u.id
+        WHERE b.is_public = TRUE
+        {'AND ' + condition if condition else ''}
+        ORDER BY {order_by}
+        LIMIT ?
+        """
+        return self.db.execute_query(query, params + (limit,))
+    
+    def get_public_build_by_id(self, build_id: int) -> Optional[Dict[str, Any]]:
+        query = """
+        SELECT 
+            b.id, b.user_id, b.name, b.description, b.created, 
+            b.updated, b.is_public, b.total_price,
+            u.username as user_username
+        FROM pcbuilder_build b
+        JOIN pcbuilder_user u ON b.user_id = u.id
+        WHERE b.id = ? AND b.is_public = TRUE
+        """
+        results = self.db.execute_query(query, (build_id,))
+        return results[0] if results else None
+    
+    def get_public_builds_by_ids(self, build_ids: List[int]) -> List[Dict[str, Any]]:
+        """Public builds among build_ids, in the order the ids were given"""
+        builds = {}
+        ids = list(dict.fromkeys(build_ids))
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            query = f"""
+            SELECT 
+                b.id, b.user_id, b.name, b.description, b.created, 
+                b.updated, b.is_public, b.total_price,
+                u.username as user_username
+            FROM pcbuilder_build b
+            JOIN pcbuilder_user u ON b.user_id = u.id
+            WHERE b.id IN ({placeholders}) AND b.is_public = TRUE
+            """
+            for row in self.db.execute_query(query, tuple(chunk)):
+                builds[row['id']] = row
+        return [builds[build_id] for build_id in ids if build_id in builds]
+    
+    def get_public_builds_state(self) -> Dict[str, Any]:
+        """Latest update and count of public builds, for the feed's ETag"""
+        query = """
+        SELECT MAX(updated) as updated, COUNT(*) as build_count
+        FROM pcbuilder_build
+        WHERE is_public = TRUE
+        """
+        return self.db.execute_query(query)[0]
+    
     def get_build_count_by_user(self, user_id: int) -> int:
         query = "SELECT COUNT(*) as build_count FROM pcbuilder_build WHERE user_id = ?"
         results = self.db.execute_query(query, (user_id,))
@@ -367,4 +1021,93 @@ class PublicBuildDB:
         ORDER BY c.price DESC
         LIMIT ?
         """
-        return self.db.execute_query(query, (limit,)) 
\ No newline at end of file
+        return self.db.execute_query(query, (limit,)) 
+
+
+# Data version counters (bumped by triggers, see migration 0004)
+class DataVersionDB:
+    def __init__(self):
+        self.db = DatabaseManager()
+    
+    def get_version(self, name: str) -> int:
+        query = "SELECT version FROM pcbuilder_dataversion WHERE name = ?"
+        results = self.db.execute_query(query, (name,))
+        return results[0]['version'] if results else 0
+    
+    def bump_version(self, name: str) -> int:
+        """Bump a counter by hand, for changes that no trigger sees"""
+        self.db.execute_update(
+            """INSERT INTO pcbuilder_dataversion (name, version) VALUES (?, 1)
+               ON CONFLICT(name) DO UPDATE SET version = version + 1""",
+            (name,)
+        )
+        return self.get_version(name)
+
+# Precomputed compatibility matrix operations (see migration 0005)
+class CompatibilityMatrixDB:
+    def __init__(self):
+        self.db = DatabaseManager()
+    
+    def get_pair(self, component1_id: int, component2_id: int, rules_version: int) -> Optional[Dict[str, Any]]:
+        query = """
+        SELECT component_a_id, component_b_id, compatible, status, rule, message
+        FROM pcbuilder_compatibilitymatrix
+        WHERE component_a_id = ? AND component_b_id = ? AND rules_version = ?
+        """
+        a, b = sorted((component1_id, component2_id))
+        results = self.db.execute_query(query, (a, b, rules_version))
+        return results[0] if results else None
+    
+    def get_pairs(self, component_ids: List[int], other_ids: List[int], rules_version: int) -> Dict[tuple, Dict[str, Any]]:
+        """Stored pairs between the two id lists, keyed by (smaller id, larger id)"""
+        pairs = {}
+        ids = list(dict.fromkeys(component_ids))
+        others = list(dict.fromkeys(other_ids))
+        for start in range(0, len(ids), 200):
+            chunk = ids[start:start + 200]
+            placeholders = ', '.join('?' * len(chunk))
+            for other_start in range(0, len(others), 200):
+                other_chunk = others[other_start:other_start + 200]
+                other_placeholders = ', '.join('?' * len(other_chunk))
+                query = f"""
+                SELECT component_a_id, component_b_id, compatible, status, rule, message
+                FROM pcbuilder_compatibilitymatrix
+                WHERE rules_version = ?
+                  AND ((component_a_id IN ({placeholders}) AND component_b_id IN ({other_placeholders}))
+                    OR (component_b_id IN ({placeholders}) AND component_a_id IN ({other_placeholders})))
+                """
+                params = (rules_version,) + tuple(chunk) + tuple(other_chunk) + tuple(chunk) + tuple(other_chunk)
+                for row in self.db.execute_query(query, params):
+                    pairs[(row['component_a_id'], row['component_b_id'])] = row
+        return pairs
+    
+    def save_pairs(self, rows: List[tuple]) -> int:
+        """
+        Upsert (component_a_id, component_b_id, rules_version, compatible,
+        status, rule, message) rows in a single transaction.
+        """
+        query = """
+        INSERT OR REPLACE INTO pcbuilder_compatibilitymatrix (
+            component_a_id, component_b_id, rules_version, compatible, status, rule, message
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        """
+        with self.db.transaction():
+            self.db.execute_many(query, rows)
+        return len(rows)
+    
+    def delete_component(self, component_id: int) -> int:
+        with self.db.transaction():
+            deleted = self.db.execute_update(
+                "DELETE FROM pcbuilder_compatibilitymatrix WHERE component_a_id = ?", (component_id,)
+            )
+            return deleted + self.db.execute_update(
+                "DELETE FROM pcbuilder_compatibilitymatrix WHERE component_b_id = ?", (component_id,)
+            )
+    
+    def clear(self) -> int:
+        return self.db.execute_update("DELETE FROM pcbuilder_compatibilitymatrix")
+    
+    def count(self, rules_version: int) -> int:
+        query = "SELECT COUNT(*) as pair_count FROM pcbuilder_compatibilitymatrix WHERE rules_version = ?"
+        results = self.db.execute_query(query, (rules_version,))
+        return results[0]['pair_count'] if results else 0
@@ -0,0 +1,161 @@
+import decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from rest_framework import serializers
+from rest_framework.fields import empty
+from rest_framework.settings import api_settings
+
+from .sql_serializers import BuildSerializer, ComponentSerializer, PublicBuildSerializer
+
+# What a field does when its key is missing from the row
+_DEFAULT, _NULL, _SKIP, _RAISE = range(4)
+
+
+def _integer(field) -> Callable:
+    return int
+
+
+def _char(field) -> Callable:
+    return str
+
+
+def _boolean(field) -> Callable:
+    represent = field.to_representation
+
+    def convert(value):
+        # 0/1 from SQLite and real booleans, without the TRUE/FALSE_VALUES lookups
+        if type(value) is int or type(value) is bool:
+            return bool(value)
+        return represent(value)
+    return convert
+
+
+def _decimal(field) -> Optional[Callable]:
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    # normalize_output only exists from DRF 3.15 on
+    normalize_output = getattr(field, 'normalize_output', False)
+    if not coerce_to_string or field.localize or normalize_output or field.decimal_places is None:
+        return None
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+    Decimal = decimal.Decimal
+
+    def convert(value):
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+        return f'{value.quantize(quantum, rounding=rounding, context=context):f}'
+    return convert
+
+
+def _datetime(field) -> Callable:
+    represent = field.to_representation
+
+    def convert(value):
+        # SQLite hands back the stored string, which DRF passes through as is
+        if isinstance(value, str):
+            return value or None
+        return represent(value)
+    return convert
+
+
+def _json(field) -> Optional[Callable]:
+    if field.binary:
+        return None
+    return lambda value: value
+
+
+def _list(field) -> Optional[Callable]:
+    if not isinstance(field.child, serializers.Serializer):
+        return None
+    child = FastSerializer(field.child)
+    convert_child = child.to_representation
+    return lambda items: [convert_child(item) if item is not None else None for item in items]
+
+
+# Field classes whose to_representation has a compiled equivalent, matched
+# on the method itself so subclasses that override it are not mistaken for
+# their parent (EmailField and URLField keep CharField's)
+_CONVERTERS = [
+    (serializers.IntegerField, _integer),
+    (serializers.CharField, _char),
+    (serializers.BooleanField, _boolean),
+    (serializers.DecimalField, _decimal),
+    (serializers.DateTimeField, _datetime),
+    (serializers.JSONField, _json),
+    (serializers.ListField, _list),
+]
+
+
+def _compile_field(field):
+    convert = None
+    for field_class, factory in _CONVERTERS:
+        if type(field).to_representation is field_class.to_representation:
+            convert = factory(field)
+            break
+    if convert is None:
+        convert = field.to_representation
+
+    if field.default is not empty:
+        missing = _DEFAULT
+    elif field.allow_null:
+        missing = _NULL
+    elif not field.required:
+        missing = _SKIP
+    else:
+        missing = _RAISE
+    # None sends nested and '*' sources through DRF's own get_attribute
+    key = field.source_attrs[0] if field.source != '*' and len(field.source_attrs) == 1 else None
+    return field.field_name, key, convert, missing, field
+
+
+class FastSerializer:
+    """
+    Read-only, precompiled counterpart of a DRF Serializer for plain dict
+    rows, producing the same output as `Serializer(row).data` without the
+    per-field method dispatch. Field types without a compiled converter fall
+    back to the field's own to_representation, and fields with nested or
+    '*' sources go through the regular DRF path.
+    """
+    def __init__(self, serializer):
+        if isinstance(serializer, type):
+            serializer = serializer()
+        self.serializer = serializer
+        self.fields = [_compile_field(field) for field in serializer._readable_fields]
+
+    def to_representation(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        data = {}
+        for name, key, convert, missing, field in self.fields:
+            if key is None:
+                try:
+                    value = field.get_attribute(row)
+                except serializers.SkipField:
+                    continue
+                data[name] = None if value is None else field.to_representation(value)
+                continue
+
+            try:
+                value = row[key]
+            except KeyError:
+                if missing == _DEFAULT:
+                    value = field.get_default()
+                elif missing == _NULL:
+                    value = None
+                elif missing == _SKIP:
+                    continue
+                else:
+                    # Let DRF raise its usual error for a required key
+                    field.get_attribute(row)
+            data[name] = None if value is None else convert(value)
+        return data
+
+    def serialize_many(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
+
+
+component_serializer = FastSerializer(ComponentSerializer)
+build_serializer = FastSerializer(BuildSerializer)
+public_build_serializer = FastSerializer(PublicBuildSerializer)
@@ -0,0 +1,70 @@
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+_current = contextvars.ContextVar('pcbuilder_identity_map', default=None)
+
+
+class IdentityMap:
+    """
+    Rows loaded during one request, keyed by (table, primary key).
+
+    Lookups that miss the database are remembered too, so asking for the same
+    missing row twice costs one query. Callers get a copy of each row and are
+    free to modify it.
+    """
+    def __init__(self):
+        self._rows = {}
+
+    def get(self, table: str, key: Any, load: Callable[[], Optional[dict]]) -> Optional[dict]:
+        try:
+            row = self._rows[(table, key)]
+        except KeyError:
+            row = self._rows[(table, key)] = load()
+        return dict(row) if row is not None else None
+
+    def forget(self, table: str, key: Any = None):
+        if key is not None:
+            self._rows.pop((table, key), None)
+            return
+        for cached in [cached for cached in self._rows if cached[0] == table]:
+            del self._rows[cached]
+
+
+@contextmanager
+def identity_map_scope():
+    token = _current.set(IdentityMap())
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def remember(table: str, key: Any, load: Callable[[], Optional[dict]]) -> Optional[dict]:
+    """Load a row through the current request's identity map, if there is one"""
+    identity_map = _current.get()
+    if identity_map is None:
+        return load()
+    return identity_map.get(table, key, load)
+
+
+def forget(table: str, key: Any = None):
+    """Drop a row (or a whole table) after a write"""
+    identity_map = _current.get()
+    if identity_map is not None:
+        identity_map.forget(table, key)
+
+
+def forget_component(sender=None, instance=None, **kwargs):
+    """post_save/post_delete receiver for Component"""
+    forget('pcbuilder_component', instance.pk if instance is not None else None)
+
+
+class IdentityMapMiddleware:
+    """Gives every request its own identity map, discarded when the response is ready"""
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with identity_map_scope():
+            return self.get_response(request)
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from pcbuilder.compatibility_matrix import CompatibilityMatrix
+
+
+class Command(BaseCommand):
+    help = "Precompute the compatibility of component pairs whose categories share a rule"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--component', type=int, action='append', dest='components',
+            help="Only recompute the pairs of this component id (can be repeated)",
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        matrix = CompatibilityMatrix(batch_size=options['batch_size'])
+        started = time.monotonic()
+
+        if options['components']:
+            total = 0
+            for component_id in options['components']:
+                saved = matrix.refresh_component(component_id)
+                self.stdout.write(f"Component {component_id}: {saved} pairs")
+                total += saved
+        else:
+            def progress(slug_a, slug_b, saved):
+                self.stdout.write(f"{slug_a} <-> {slug_b}: {saved} pairs")
+            total = matrix.rebuild(progress=progress)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Stored {total} pairs in {elapsed:.2f}s"))
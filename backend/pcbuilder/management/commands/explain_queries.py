@@ -0,0 +1,174 @@
+import inspect
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pcbuilder.database import (
+    BuildComponentDB, BuildDB, CategoryDB, CompatibilityMatrixDB, ComponentDB,
+    DatabaseManager, DataVersionDB, PublicBuildDB, UserDB, VendorDB,
+)
+
+# Methods exercised with sample arguments. Values do not need to exist in the
+# database; only the shape of each query matters to the plan.
+SAMPLE_CALLS = {
+    UserDB: {
+        'get_all_users': (),
+        'get_users_page': (10, (1,)),
+        'get_user_by_id': (1,),
+        'get_user_by_email': ('someone@example.com',),
+        'get_user_by_username': ('someone',),
+        'check_password': (1, 'password'),
+    },
+    CategoryDB: {
+        'get_all_categories': (),
+        'get_category_by_id': (1,),
+    },
+    VendorDB: {
+        'get_all_vendors': (),
+        'get_vendor_by_id': (1,),
+    },
+    ComponentDB: {
+        'get_all_components': (),
+        'get_components_page': (10, (1, 100.0, 1), None, 'cpu', {'price': (50.0, None)}),
+        'get_facets': ('motherboard', {'socket': ['AM5']}),
+        'get_component_names': (),
+        'get_component_by_id': (1,),
+        'get_components_by_ids': ([1, 2, 3],),
+        'get_components_by_category': ('cpu',),
+        'search_components': ('ryzen',),
+        'search_components_page': ('ryzen', 10, (-1.0, 1), None, 'cpu'),
+        'get_components_by_price_range': (100.0, 200.0),
+    },
+    BuildDB: {
+        'get_user_builds': (1,),
+        'get_build_by_id': (1,),
+        'update_build': (0, 'name'),
+        'delete_build': (0,),
+        'update_build_total_price': (0,),
+        'update_total_prices_for_components': ([1, 2, 3],),
+    },
+    BuildComponentDB: {
+        'get_build_components': (1,),
+        'get_components_for_builds': ([1, 2, 3],),
+        'remove_component_from_build': (0, 0),
+        'update_component_quantity': (0, 0, 1),
+        # Fails validation on an empty build, so only the reads are explained;
+        # the writes are the statements above, sent through executemany
+        'apply_operations': (0, [{'op': 'add', 'component_id': 1}, {'op': 'remove', 'component_id': 2}]),
+    },
+    PublicBuildDB: {
+        'get_public_builds': (),
+        'get_public_builds_page': (10, ('2024-01-01 00:00:00', 1)),
+        'get_public_build_by_id': (1,),
+        'get_public_builds_by_ids': ([1, 2, 3],),
+        'get_public_builds_state': (),
+        'get_build_count_by_user': (1,),
+        'get_average_component_price_by_category': (1,),
+        'get_top_expensive_components': (10,),
+    },
+    DataVersionDB: {
+        'get_version': ('catalog',),
+    },
+    CompatibilityMatrixDB: {
+        'get_pair': (1, 2, 0),
+        'get_pairs': ([1, 2], [3, 4], 0),
+        'delete_component': (0,),
+        'count': (0,),
+    },
+}
+
+# Methods that are not explained: inserts have no plan to speak of, and
+# bump_version/clear write outside the recorder's control.
+SKIPPED = {
+    'create_user', 'create_build', 'add_component_to_build', 'save_pairs',
+    'bump_version', 'clear', 'build_match_query',
+}
+
+# Queries that read a whole table on purpose. Everything else must search an
+# index; `SCAN ... USING INDEX` walks of a LIMITed keyset page are fine too.
+ALLOWED_SCANS = {
+    'UserDB.get_all_users',
+    'CategoryDB.get_all_categories',
+    'VendorDB.get_all_vendors',
+    'ComponentDB.get_all_components',
+    'ComponentDB.get_component_names',
+    # Only reported by build_compatibility_matrix
+    'CompatibilityMatrixDB.count',
+}
+
+
+class RecordingDatabaseManager(DatabaseManager):
+    """
+    DatabaseManager that records the plan of every statement. Reads still run
+    so methods can work with their results; writes are explained, not run.
+    """
+    def __init__(self):
+        super().__init__()
+        self.plans = []
+
+    def explain(self, query: str, params: tuple):
+        conn = self.get_connection()
+        rows = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        self.plans.append((query, [row['detail'] for row in rows]))
+
+    def execute_query(self, query, params=()):
+        self.explain(query, params)
+        return super().execute_query(query, params)
+
+    def execute_update(self, query, params=()):
+        self.explain(query, params)
+        return 0
+
+    def execute_insert(self, query, params=()):
+        self.explain(query, params)
+        return 0
+
+    def execute_many(self, query, params_seq):
+        params_seq = list(params_seq)
+        if params_seq:
+            self.explain(query, params_seq[0])
+        return 0
+
+
+def is_full_scan(detail: str) -> bool:
+    if not detail.startswith('SCAN '):
+        return False
+    return not any(
+        marker in detail
+        for marker in ('USING INDEX', 'USING COVERING INDEX', 'VIRTUAL TABLE', 'CONSTANT ROW', 'subquery')
+    )
+
+
+class Command(BaseCommand):
+    help = "Run EXPLAIN QUERY PLAN over the queries in database.py and fail on full table scans"
+
+    def handle(self, *args, **options):
+        failures = []
+        for db_class, calls in SAMPLE_CALLS.items():
+            untested = [
+                name for name, _ in inspect.getmembers(db_class, inspect.isfunction)
+                if not name.startswith('_') and name not in calls and name not in SKIPPED
+            ]
+            for name in untested:
+                self.stdout.write(self.style.WARNING(f"{db_class.__name__}.{name}: no sample call"))
+
+            for name, args in calls.items():
+                label = f"{db_class.__name__}.{name}"
+                instance = db_class()
+                instance.db = RecordingDatabaseManager()
+                getattr(instance, name)(*args)
+
+                scans = []
+                self.stdout.write(label)
+                for query, details in instance.db.plans:
+                    for detail in details:
+                        self.stdout.write(f"  {detail}")
+                        if is_full_scan(detail):
+                            scans.append(detail)
+                if scans and label not in ALLOWED_SCANS:
+                    failures.append((label, scans))
+
+        if failures:
+            for label, scans in failures:
+                self.stderr.write(f"{label}: {'; '.join(scans)}")
+            raise CommandError(f"{len(failures)} queries do a full table scan")
+        self.stdout.write(self.style.SUCCESS("No unexpected table scans"))
@@ -0,0 +1,130 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pcbuilder.catalog_feed import CSV_COLUMNS, FORMATS, feed_format, read_feed
+from pcbuilder.catalog_loader import CatalogLoader
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream a vendor feed (CSV or JSONL) into the component catalog. "
+        f"CSV files need a header row with the columns {', '.join(CSV_COLUMNS)} "
+        "(specs as a JSON object); JSONL files hold one such object per line. "
+        "Progress is checkpointed, so an interrupted import resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS, help="Default: from the file extension")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--checkpoint',
+            help="Checkpoint file (default: <path>.checkpoint); removed once the import completes",
+        )
+        parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint")
+        parser.add_argument(
+            '--sync', action='store_true',
+            help="Only write records that changed since the last sync, by content hash, "
+                 "and refresh the totals of builds whose parts changed price",
+        )
+        parser.add_argument('--progress-interval', type=float, default=5.0, help="Seconds between progress lines")
+        parser.add_argument('--max-errors', type=int, default=20, help="How many rejected records to print")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f"No such file: {path}")
+        try:
+            format = options['format'] or feed_format(path)
+        except ValueError as error:
+            raise CommandError(str(error))
+        checkpoint_path = options['checkpoint'] or f"{path}.checkpoint"
+        size = os.path.getsize(path)
+
+        checkpoint = None if options['restart'] else self.read_checkpoint(checkpoint_path, path)
+        start = checkpoint['offset'] if checkpoint else 0
+        stats = checkpoint['stats'] if checkpoint else {}
+        rejected = {'count': checkpoint['rejected'] if checkpoint else 0}
+        if checkpoint:
+            self.stdout.write(f"Resuming at byte {start} of {size} ({stats['records']} records done)")
+
+        def reject(error):
+            if rejected['count'] < options['max_errors']:
+                self.stderr.write(f"Rejected record ending at byte {error.offset}: {error}")
+            rejected['count'] += 1
+
+        # parse -> validate specs per category (read_feed), then resolve
+        # category/vendor ids -> batch upsert (CatalogLoader)
+        position = {'offset': start}
+
+        def records():
+            for record, end in read_feed(path, format, start, on_error=reject):
+                position['offset'] = end
+                yield record
+
+        started = time.monotonic()
+        reported = {'at': started}
+
+        def progress(batch_stats):
+            # Everything read so far is committed, so a new run can continue from here
+            self.write_checkpoint(checkpoint_path, path, position['offset'], batch_stats, rejected['count'])
+            now = time.monotonic()
+            if now - reported['at'] >= options['progress_interval']:
+                reported['at'] = now
+                self.stdout.write(self.throughput(batch_stats, start, position['offset'], size, now - started))
+
+        loader = CatalogLoader(batch_size=options['batch_size'])
+        stats = loader.load_components(records(), progress=progress, stats=stats, sync=options['sync'])
+        elapsed = time.monotonic() - started
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        self.stdout.write(self.throughput(stats, start, size, size, elapsed))
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['records']} records in {elapsed:.2f}s: {stats['written']} inserted or changed, "
+            f"{stats['skipped']} with an unknown category or vendor, {rejected['count']} rejected"
+        ))
+        if options['sync']:
+            self.stdout.write(
+                f"Sync: {stats['unchanged']} unchanged, {stats['builds_repriced']} build totals refreshed"
+            )
+
+    def throughput(self, stats, start, offset, size, elapsed):
+        elapsed = max(elapsed, 1e-6)
+        done = 100.0 * offset / size if size else 100.0
+        return (
+            f"{done:5.1f}% | {stats['records']} records, {stats['written']} written | "
+            f"{(offset - start) / elapsed / 1e6:.1f} MB/s, {stats['batches']} batches"
+        )
+
+    def read_checkpoint(self, checkpoint_path, path):
+        if not os.path.exists(checkpoint_path):
+            return None
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+        stat = os.stat(path)
+        if (checkpoint.get('path') != os.path.abspath(path) or checkpoint.get('size') != stat.st_size
+                or checkpoint.get('mtime') != stat.st_mtime):
+            raise CommandError(
+                f"{checkpoint_path} was written for a different or since modified file; "
+                "use --restart to import from the beginning"
+            )
+        return checkpoint
+
+    def write_checkpoint(self, checkpoint_path, path, offset, stats, rejected):
+        stat = os.stat(path)
+        checkpoint = {
+            'path': os.path.abspath(path),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'offset': offset,
+            'stats': stats,
+            'rejected': rejected,
+        }
+        # Write and rename, so a crash never leaves a half-written checkpoint
+        with open(f"{checkpoint_path}.tmp", 'w') as f:
+            json.dump(checkpoint, f)
+        os.replace(f"{checkpoint_path}.tmp", checkpoint_path)
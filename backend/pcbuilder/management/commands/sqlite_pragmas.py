@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from pcbuilder.database import DatabaseManager
+
+# Reported even when they are not part of SQLITE_PRAGMAS
+REPORTED_PRAGMAS = [
+    'journal_mode',
+    'synchronous',
+    'busy_timeout',
+    'cache_size',
+    'mmap_size',
+    'temp_store',
+    'page_size',
+    'foreign_keys',
+]
+
+
+class Command(BaseCommand):
+    help = "Report the pragmas active on a pooled SQLite connection"
+
+    def handle(self, *args, **options):
+        db = DatabaseManager()
+        configured = getattr(settings, 'SQLITE_PRAGMAS', {})
+        names = list(configured) + [name for name in REPORTED_PRAGMAS if name not in configured]
+
+        conn = db.get_connection()
+        self.stdout.write(f"Database: {db.db_path}")
+        for name in names:
+            row = conn.execute(f"PRAGMA {name}").fetchone()
+            active = row[0] if row else None
+            line = f"  {name} = {active}"
+            if name in configured:
+                line += f"  (configured: {configured[name]})"
+            self.stdout.write(line)
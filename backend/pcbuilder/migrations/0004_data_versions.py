@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Version counters let every worker notice that cached data went stale,
+# whichever process (admin, populate_database.py, another worker) wrote it.
+# Triggers bump the counter on every change to the underlying table.
+
+CREATE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS pcbuilder_dataversion (
+        name VARCHAR(50) NOT NULL PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "INSERT OR IGNORE INTO pcbuilder_dataversion (name, version) VALUES ('compatibility_rules', 0)",
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_compatibilityrule_version_{event.lower()}
+    AFTER {event} ON pcbuilder_compatibilityrule
+    BEGIN
+        UPDATE pcbuilder_dataversion SET version = version + 1 WHERE name = 'compatibility_rules';
+    END
+    """
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS pcbuilder_compatibilityrule_version_{event.lower()}"
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+] + [
+    "DROP TABLE IF EXISTS pcbuilder_dataversion",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0003_populate_components'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
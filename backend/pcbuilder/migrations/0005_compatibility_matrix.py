@@ -0,0 +1,58 @@
+from django.db import migrations
+
+# Precomputed compatibility of component pairs whose categories share a rule.
+# Pairs are stored once, with component_a_id < component_b_id, and stamped
+# with the compatibility_rules version they were computed under. Editing a
+# component's specs or category (or deleting it) drops its pairs, so the
+# table never answers with stale data; missing pairs are checked live.
+
+CREATE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS pcbuilder_compatibilitymatrix (
+        component_a_id INTEGER NOT NULL,
+        component_b_id INTEGER NOT NULL,
+        rules_version INTEGER NOT NULL,
+        compatible BOOL NOT NULL,
+        status VARCHAR(10) NOT NULL,
+        rule VARCHAR(50) NOT NULL,
+        message TEXT NOT NULL,
+        PRIMARY KEY (component_a_id, component_b_id)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS pcbuilder_compatibilitymatrix_b
+    ON pcbuilder_compatibilitymatrix (component_b_id)
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_component_matrix_update
+    AFTER UPDATE OF specs, category_id ON pcbuilder_component
+    BEGIN
+        DELETE FROM pcbuilder_compatibilitymatrix WHERE component_a_id = old.id;
+        DELETE FROM pcbuilder_compatibilitymatrix WHERE component_b_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_component_matrix_delete
+    AFTER DELETE ON pcbuilder_component
+    BEGIN
+        DELETE FROM pcbuilder_compatibilitymatrix WHERE component_a_id = old.id;
+        DELETE FROM pcbuilder_compatibilitymatrix WHERE component_b_id = old.id;
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS pcbuilder_component_matrix_update",
+    "DROP TRIGGER IF EXISTS pcbuilder_component_matrix_delete",
+    "DROP TABLE IF EXISTS pcbuilder_compatibilitymatrix",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0004_data_versions'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,80 @@
+from django.db import migrations
+
+# Full-text index over component name, description, vendor name and the
+# flattened spec values. rowid is the component id. Triggers keep it in
+# sync with pcbuilder_component and vendor renames.
+
+# Space-separated scalar values of a specs JSON document
+SPEC_VALUES = """
+    CASE WHEN json_valid({specs}) THEN (
+        SELECT group_concat(value, ' ') FROM json_tree({specs})
+        WHERE type NOT IN ('object', 'array')
+    ) ELSE {specs} END
+"""
+
+INDEX_COMPONENT = """
+    INSERT INTO pcbuilder_component_fts (rowid, name, description, vendor, specs)
+    SELECT c.id, c.name, c.description, v.name, {spec_values}
+    FROM pcbuilder_component c
+    JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+    {where}
+"""
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS pcbuilder_component_fts USING fts5(
+        name, description, vendor, specs,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    INDEX_COMPONENT.format(spec_values=SPEC_VALUES.format(specs='c.specs'), where=''),
+    f"""
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_component_fts_insert
+    AFTER INSERT ON pcbuilder_component
+    BEGIN
+        {INDEX_COMPONENT.format(spec_values=SPEC_VALUES.format(specs='c.specs'), where='WHERE c.id = new.id')};
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_component_fts_update
+    AFTER UPDATE OF name, description, vendor_id, specs ON pcbuilder_component
+    BEGIN
+        DELETE FROM pcbuilder_component_fts WHERE rowid = old.id;
+        {INDEX_COMPONENT.format(spec_values=SPEC_VALUES.format(specs='c.specs'), where='WHERE c.id = new.id')};
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_component_fts_delete
+    AFTER DELETE ON pcbuilder_component
+    BEGIN
+        DELETE FROM pcbuilder_component_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_vendor_fts_update
+    AFTER UPDATE OF name ON pcbuilder_vendor
+    BEGIN
+        UPDATE pcbuilder_component_fts SET vendor = new.name
+        WHERE rowid IN (SELECT id FROM pcbuilder_component WHERE vendor_id = new.id);
+    END
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS pcbuilder_vendor_fts_update",
+    "DROP TRIGGER IF EXISTS pcbuilder_component_fts_delete",
+    "DROP TRIGGER IF EXISTS pcbuilder_component_fts_update",
+    "DROP TRIGGER IF EXISTS pcbuilder_component_fts_insert",
+    "DROP TABLE IF EXISTS pcbuilder_component_fts",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0005_compatibility_matrix'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
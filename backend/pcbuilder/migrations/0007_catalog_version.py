@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# 'catalog' counter in pcbuilder_dataversion, bumped by any write to the
+# category, vendor or component tables. In-memory catalog structures
+# (autocomplete index, catalog cache) compare it to know when to reload.
+
+CATALOG_TABLES = ('pcbuilder_category', 'pcbuilder_vendor', 'pcbuilder_component')
+EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+CREATE_SQL = [
+    "INSERT OR IGNORE INTO pcbuilder_dataversion (name, version) VALUES ('catalog', 0)",
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {table}_catalog_version_{event.lower()}
+    AFTER {event} ON {table}
+    BEGIN
+        UPDATE pcbuilder_dataversion SET version = version + 1 WHERE name = 'catalog';
+    END
+    """
+    for table in CATALOG_TABLES
+    for event in EVENTS
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS {table}_catalog_version_{event.lower()}"
+    for table in CATALOG_TABLES
+    for event in EVENTS
+] + [
+    "DELETE FROM pcbuilder_dataversion WHERE name = 'catalog'",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0006_component_search'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+
+# Expression indexes on the spec keys the catalog filters on. Queries must
+# use the exact same expression, json_extract(specs, '$.<key>'), for SQLite
+# to pick them up (see ComponentDB.FILTERS).
+
+SPEC_KEYS = ('socket', 'form_factor', 'wattage', 'length', 'tdp')
+
+CREATE_SQL = [
+    f"""
+    CREATE INDEX IF NOT EXISTS pcbuilder_component_spec_{key}
+    ON pcbuilder_component (category_id, json_extract(specs, '$.{key}'))
+    """
+    for key in SPEC_KEYS
+]
+
+DROP_SQL = [
+    f"DROP INDEX IF EXISTS pcbuilder_component_spec_{key}"
+    for key in SPEC_KEYS
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0007_catalog_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Composite indexes for the access paths of the raw SQL in database.py.
+# Build.user_id is a plain IntegerField and the other tables only got the
+# single-column foreign key indexes, so nothing guaranteed these existed.
+# `python manage.py explain_queries` checks that every query uses one.
+
+INDEXES = {
+    # BuildDB.get_user_builds / get_build_count_by_user
+    'pcbuilder_build_user_created': 'pcbuilder_build (user_id, created)',
+    # PublicBuildDB.get_public_builds(_page): newest public builds by (created, id)
+    'pcbuilder_build_public_created': 'pcbuilder_build (is_public, created, id)',
+    # ComponentDB.get_components_page ordering and per-category price queries
+    'pcbuilder_component_category_price': 'pcbuilder_component (category_id, price, id)',
+    # ComponentDB.get_top_expensive_components / get_components_by_price_range
+    'pcbuilder_component_price': 'pcbuilder_component (price)',
+    # BuildComponentDB lookups by build, covering the columns the joins need
+    'pcbuilder_buildcomponent_build_component': 'pcbuilder_buildcomponent (build_id, component_id, quantity)',
+    # Rule lookups by category pair
+    'pcbuilder_compatibilityrule_source_target': 'pcbuilder_compatibilityrule (source_id, target_id)',
+}
+
+CREATE_SQL = [
+    f"CREATE INDEX IF NOT EXISTS {name} ON {definition}"
+    for name, definition in INDEXES.items()
+]
+
+DROP_SQL = [
+    f"DROP INDEX IF EXISTS {name}"
+    for name in INDEXES
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0008_component_spec_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
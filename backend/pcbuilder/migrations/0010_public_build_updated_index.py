@@ -0,0 +1,21 @@
+from django.db import migrations
+
+# Serves PublicBuildDB.get_public_builds_state (MAX(updated) of public
+# builds), which every conditional GET of the public feed runs.
+
+CREATE_SQL = """
+CREATE INDEX IF NOT EXISTS pcbuilder_build_public_updated
+ON pcbuilder_build (is_public, updated)
+"""
+
+DROP_SQL = "DROP INDEX IF EXISTS pcbuilder_build_public_updated"
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0009_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
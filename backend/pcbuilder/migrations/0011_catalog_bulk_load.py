@@ -0,0 +1,106 @@
+from django.db import migrations, models
+
+# Support for pcbuilder.catalog_loader.
+#
+# A component is identified by its vendor and name in vendor feeds, so the
+# loader upserts on that pair (INSERT ... ON CONFLICT), which needs a unique
+# index to conflict on. It is declared on the model too (Component.Meta),
+# so the admin reports a duplicate as a form error. Components that already
+# share a vendor and name keep the oldest one's name; the others get their
+# id appended, so no component or build is lost.
+#
+# The per-row search index and catalog version triggers cost several times
+# more than the insert itself. While the 'catalog_bulk_load' counter is 1
+# they stand down and the loader indexes each batch with one statement and
+# bumps the catalog version once. The loader sets and clears the counter
+# inside each batch's transaction, so no other connection ever sees it set.
+
+SPEC_VALUES = """
+    CASE WHEN json_valid(c.specs) THEN (
+        SELECT group_concat(value, ' ') FROM json_tree(c.specs)
+        WHERE type NOT IN ('object', 'array')
+    ) ELSE c.specs END
+"""
+
+INDEX_COMPONENT = f"""
+    INSERT INTO pcbuilder_component_fts (rowid, name, description, vendor, specs)
+    SELECT c.id, c.name, c.description, v.name, {SPEC_VALUES}
+    FROM pcbuilder_component c
+    JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+    WHERE c.id = new.id;
+"""
+
+BUMP_CATALOG = "UPDATE pcbuilder_dataversion SET version = version + 1 WHERE name = 'catalog';"
+
+NOT_BULK_LOADING = "(SELECT version FROM pcbuilder_dataversion WHERE name = 'catalog_bulk_load') IS NOT 1"
+
+# name -> (event, body)
+TRIGGERS = {
+    'pcbuilder_component_fts_insert': ('INSERT', INDEX_COMPONENT),
+    'pcbuilder_component_catalog_version_insert': ('INSERT', BUMP_CATALOG),
+    'pcbuilder_component_catalog_version_update': ('UPDATE', BUMP_CATALOG),
+}
+
+
+def create_triggers(when: str = ''):
+    return [
+        f"""
+        CREATE TRIGGER {name}
+        AFTER {event} ON pcbuilder_component
+        {when}
+        BEGIN
+            {body}
+        END
+        """
+        for name, (event, body) in TRIGGERS.items()
+    ]
+
+
+DROP_TRIGGERS = [f"DROP TRIGGER IF EXISTS {name}" for name in TRIGGERS]
+
+CREATE_UNIQUE_SQL = [
+    """
+    UPDATE pcbuilder_component SET name = name || ' (#' || id || ')'
+    WHERE id NOT IN (SELECT MIN(id) FROM pcbuilder_component GROUP BY vendor_id, name)
+    """,
+    """
+    CREATE UNIQUE INDEX IF NOT EXISTS pcbuilder_component_vendor_name
+    ON pcbuilder_component (vendor_id, name)
+    """,
+]
+
+# Renamed duplicates keep their new names
+DROP_UNIQUE_SQL = [
+    "DROP INDEX IF EXISTS pcbuilder_component_vendor_name",
+]
+
+CREATE_SQL = [
+    "INSERT OR IGNORE INTO pcbuilder_dataversion (name, version) VALUES ('catalog_bulk_load', 0)",
+] + DROP_TRIGGERS + create_triggers(f"WHEN {NOT_BULK_LOADING}")
+
+DROP_SQL = DROP_TRIGGERS + create_triggers() + [
+    "DELETE FROM pcbuilder_dataversion WHERE name = 'catalog_bulk_load'",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0010_public_build_updated_index'),
+    ]
+
+    operations = [
+        # Only the index is created: adding the constraint the usual way
+        # would rebuild the table and lose its triggers
+        migrations.SeparateDatabaseAndState(
+            database_operations=[migrations.RunSQL(CREATE_UNIQUE_SQL, DROP_UNIQUE_SQL)],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='component',
+                    constraint=models.UniqueConstraint(
+                        fields=['vendor', 'name'], name='pcbuilder_component_vendor_name'
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,105 @@
+from django.db import migrations
+
+# Support for `import_catalog --sync` (CatalogLoader with sync=True).
+#
+# pcbuilder_componenthash keeps a content hash of the feed record each
+# component was last synced from, so a sync can skip unchanged records
+# without comparing columns. Any later change to the row drops its hash, so
+# the next sync compares that record again.
+#
+# The matrix and search index update triggers now only fire when the columns
+# they depend on actually changed: a price-only update no longer discards a
+# component's compatibility pairs or re-indexes it.
+
+SPEC_VALUES = """
+    CASE WHEN json_valid(c.specs) THEN (
+        SELECT group_concat(value, ' ') FROM json_tree(c.specs)
+        WHERE type NOT IN ('object', 'array')
+    ) ELSE c.specs END
+"""
+
+INDEX_COMPONENT = f"""
+    INSERT INTO pcbuilder_component_fts (rowid, name, description, vendor, specs)
+    SELECT c.id, c.name, c.description, v.name, {SPEC_VALUES}
+    FROM pcbuilder_component c
+    JOIN pcbuilder_vendor v ON c.vendor_id = v.id
+    WHERE c.id = new.id;
+"""
+
+DROP_PAIRS = """
+    DELETE FROM pcbuilder_compatibilitymatrix WHERE component_a_id = old.id;
+    DELETE FROM pcbuilder_compatibilitymatrix WHERE component_b_id = old.id;
+"""
+
+
+def update_triggers(matrix_when: str = '', fts_when: str = ''):
+    return [
+        f"""
+        CREATE TRIGGER pcbuilder_component_matrix_update
+        AFTER UPDATE OF specs, category_id ON pcbuilder_component
+        {matrix_when}
+        BEGIN
+            {DROP_PAIRS}
+        END
+        """,
+        f"""
+        CREATE TRIGGER pcbuilder_component_fts_update
+        AFTER UPDATE OF name, description, vendor_id, specs ON pcbuilder_component
+        {fts_when}
+        BEGIN
+            DELETE FROM pcbuilder_component_fts WHERE rowid = old.id;
+            {INDEX_COMPONENT}
+        END
+        """,
+    ]
+
+
+DROP_UPDATE_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS pcbuilder_component_matrix_update",
+    "DROP TRIGGER IF EXISTS pcbuilder_component_fts_update",
+]
+
+CREATE_SQL = [
+    """
+    CREATE TABLE IF NOT EXISTS pcbuilder_componenthash (
+        component_id INTEGER PRIMARY KEY,
+        content_hash CHAR(40) NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_component_hash_update
+    AFTER UPDATE ON pcbuilder_component
+    BEGIN
+        DELETE FROM pcbuilder_componenthash WHERE component_id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_component_hash_delete
+    AFTER DELETE ON pcbuilder_component
+    BEGIN
+        DELETE FROM pcbuilder_componenthash WHERE component_id = old.id;
+    END
+    """,
+] + DROP_UPDATE_TRIGGERS + update_triggers(
+    matrix_when="WHEN old.specs IS NOT new.specs OR old.category_id IS NOT new.category_id",
+    fts_when=(
+        "WHEN old.name IS NOT new.name OR old.description IS NOT new.description "
+        "OR old.vendor_id IS NOT new.vendor_id OR old.specs IS NOT new.specs"
+    ),
+)
+
+DROP_SQL = DROP_UPDATE_TRIGGERS + update_triggers() + [
+    "DROP TRIGGER IF EXISTS pcbuilder_component_hash_delete",
+    "DROP TRIGGER IF EXISTS pcbuilder_component_hash_update",
+    "DROP TABLE IF EXISTS pcbuilder_componenthash",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0011_catalog_bulk_load'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
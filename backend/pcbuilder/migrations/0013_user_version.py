@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# 'users' counter in pcbuilder_dataversion, bumped by any change to an
+# existing user. The authenticated user cache (user_cache.py) compares it to
+# drop users that were edited or deactivated, by whichever process.
+
+CREATE_SQL = [
+    "INSERT OR IGNORE INTO pcbuilder_dataversion (name, version) VALUES ('users', 0)",
+] + [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS pcbuilder_user_version_{event.lower()}
+    AFTER {event} ON pcbuilder_user
+    BEGIN
+        UPDATE pcbuilder_dataversion SET version = version + 1 WHERE name = 'users';
+    END
+    """
+    for event in ('UPDATE', 'DELETE')
+]
+
+DROP_SQL = [
+    f"DROP TRIGGER IF EXISTS pcbuilder_user_version_{event.lower()}"
+    for event in ('UPDATE', 'DELETE')
+] + [
+    "DELETE FROM pcbuilder_dataversion WHERE name = 'users'",
+]
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0012_catalog_sync'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_SQL, DROP_SQL),
+    ]
@@ -0,0 +1,52 @@
+from django.db import migrations, models
+from django.db.models import F, Func, Value
+
+# The component indexes from 0008 and 0009 were created with RunSQL, so the
+# migration state did not know them and SQLite table rebuilds (which Django
+# does for many AlterField/AddConstraint operations) would drop them without
+# a word. They are now declared in Component.Meta.indexes and recreated here
+# under names that fit Django's 30 character limit. The spec expressions
+# must stay exactly what ComponentDB.FILTERS queries on.
+
+OLD_INDEXES = {
+    'pcbuilder_component_spec_socket': "pcbuilder_component (category_id, json_extract(specs, '$.socket'))",
+    'pcbuilder_component_spec_form_factor': "pcbuilder_component (category_id, json_extract(specs, '$.form_factor'))",
+    'pcbuilder_component_spec_wattage': "pcbuilder_component (category_id, json_extract(specs, '$.wattage'))",
+    'pcbuilder_component_spec_length': "pcbuilder_component (category_id, json_extract(specs, '$.length'))",
+    'pcbuilder_component_spec_tdp': "pcbuilder_component (category_id, json_extract(specs, '$.tdp'))",
+    'pcbuilder_component_category_price': 'pcbuilder_component (category_id, price, id)',
+    'pcbuilder_component_price': 'pcbuilder_component (price)',
+}
+
+SPEC_KEYS = ('socket', 'form_factor', 'wattage', 'length', 'tdp')
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('pcbuilder', '0013_user_version'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            [f"DROP INDEX IF EXISTS {name}" for name in OLD_INDEXES],
+            [f"CREATE INDEX IF NOT EXISTS {name} ON {definition}" for name, definition in OLD_INDEXES.items()],
+        ),
+    ] + [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(
+                F('category'), Func(F('specs'), Value(f'$.{key}'), function='json_extract'),
+                name=f'component_spec_{key}',
+            ),
+        )
+        for key in SPEC_KEYS
+    ] + [
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['category', 'price', 'id'], name='component_category_price'),
+        ),
+        migrations.AddIndex(
+            model_name='component',
+            index=models.Index(fields=['price'], name='component_price'),
+        ),
+    ]
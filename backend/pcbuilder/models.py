@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import F, Func, Value
 from django.core.validators import MinValueValidator, RegexValidator
 from django.urls import reverse
 import json
@@ -39,6 +40,25 @@ class Component(models.Model):
     specs = models.JSONField(default=dict)  # e.g. {"clock_speed": "3.5GHz"}
     stock = models.IntegerField(default=100)  # Inventory tracking
 
+    class Meta:
+        constraints = [
+            # Vendor feeds identify components this way (catalog_loader.py)
+            models.UniqueConstraint(fields=['vendor', 'name'], name='pcbuilder_component_vendor_name'),
+        ]
+        indexes = [
+            # Spec filters; the expressions must match ComponentDB.FILTERS exactly
+            *[
+                models.Index(
+                    F('category'), Func(F('specs'), Value(f'$.{key}'), function='json_extract'),
+                    name=f'component_spec_{key}',
+                )
+                for key in ('socket', 'form_factor', 'wattage', 'length', 'tdp')
+            ],
+            # Catalog pages by category and price, price range queries
+            models.Index(fields=['category', 'price', 'id'], name='component_category_price'),
+            models.Index(fields=['price'], name='component_price'),
+        ]
+
     def get_absolute_url(self):
         return reverse('component-detail', args=[str(self.id)])
 
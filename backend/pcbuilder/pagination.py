@@ -0,0 +1,108 @@
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination for the raw SQL list endpoints.
+
+    Pages are fetched with a keyset condition in SQL (see the *_page methods
+    in database.py) rather than OFFSET, so every page costs the same no
+    matter how deep it is. Cursors are opaque to clients: they encode the
+    sort key of the row at the edge of the current page and the direction
+    to read in.
+
+    `fetch(limit, after, before)` must return up to `limit` rows that sort
+    after the `after` key, or, when paging backwards, the rows that sort
+    before the `before` key starting from the one nearest to it.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def __init__(self, request, key_fields: List[str]):
+        self.request = request
+        self.key_fields = key_fields
+
+    def get_page_size(self) -> int:
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 10
+        requested = self.request.query_params.get(self.page_size_query_param)
+        if requested:
+            try:
+                page_size = int(requested)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, row: Dict[str, Any], reverse: bool) -> str:
+        payload = {'k': [row[field] for field in self.key_fields]}
+        if reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str) -> Dict[str, Any]:
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            payload = json.loads(data)
+            key = payload['k']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise NotFound('Invalid cursor')
+        # Key values are bound straight into the keyset condition
+        if (not isinstance(key, list) or len(key) != len(self.key_fields)
+                or not all(value is None or isinstance(value, (str, int, float)) for value in key)):
+            raise NotFound('Invalid cursor')
+        return {'key': tuple(key), 'reverse': bool(payload.get('r'))}
+
+    def paginate(self, fetch: Callable[..., List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Fetch the requested page; call get_paginated_data() afterwards"""
+        page_size = self.get_page_size()
+        encoded = self.request.query_params.get(self.cursor_query_param)
+        cursor = self.decode_cursor(encoded) if encoded else None
+
+        if cursor and cursor['reverse']:
+            rows = fetch(page_size + 1, before=cursor['key'])
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            rows = fetch(page_size + 1, after=cursor['key'] if cursor else None)
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            self.has_previous, self.has_next = cursor is not None, has_more
+
+        self.page = rows
+        return rows
+
+    def get_link(self, row: Optional[Dict[str, Any]], reverse: bool) -> Optional[str]:
+        url = self.request.build_absolute_uri()
+        if row is None:
+            # Back at the start of the list
+            return remove_query_param(url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(row, reverse))
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.get_link(None, reverse=True)
+        return self.get_link(self.page[0], reverse=True)
+
+    def get_paginated_data(self, results: List[Any]) -> Dict[str, Any]:
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': results,
+        }
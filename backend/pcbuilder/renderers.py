@@ -0,0 +1,122 @@
+import json
+import uuid
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional, the stdlib encoder is used instead
+    orjson = None
+
+_native_fragment = getattr(orjson, 'Fragment', None)
+# Datetimes go through DRF's encoder so they are formatted the same way
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+
+class Fragment:
+    """
+    Already-encoded JSON, e.g. a cached catalog payload. FastJSONRenderer
+    splices it into the response as is instead of encoding it again.
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    @classmethod
+    def encode(cls, value) -> 'Fragment':
+        return cls(FastJSONRenderer().render(value))
+
+    def decode(self):
+        return json.loads(self.data)
+
+
+class _Splicer:
+    """Stands in for Fragments with unique strings and swaps the bytes in afterwards"""
+    def __init__(self):
+        self.token = None
+        self.fragments = []
+
+    def placeholder(self, fragment: Fragment) -> str:
+        if self.token is None:
+            self.token = uuid.uuid4().hex
+        self.fragments.append(fragment.data)
+        return f'@fragment:{self.token}:{len(self.fragments) - 1}@'
+
+    def splice(self, encoded: bytes) -> bytes:
+        for index, data in enumerate(self.fragments):
+            encoded = encoded.replace(f'"@fragment:{self.token}:{index}@"'.encode(), data, 1)
+        return encoded
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed and accepts
+    Fragments anywhere in the data. A response whose data is a single
+    Fragment is written out without any encoding at all.
+
+    Output matches JSONRenderer's compact form except for floats: orjson
+    writes exponents as 1e-7 or 1e16 where the stdlib writes 1e-07 and
+    1e+16, and NaN/Infinity as null instead of refusing them. Data orjson
+    cannot encode at all, such as ints beyond 64 bits, goes through the
+    stdlib path, as does indented output (the browsable API, `; indent=`
+    media types).
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(_expand_fragments(data), accepted_media_type, renderer_context)
+        if isinstance(data, Fragment):
+            return data.data
+
+        splicer = _Splicer()
+        encoded = None
+        if orjson is not None and self.compact and not self.ensure_ascii:
+            try:
+                encoded = orjson.dumps(data, default=self._orjson_default(splicer), option=_ORJSON_OPTIONS)
+            except orjson.JSONEncodeError:
+                splicer = _Splicer()
+        if encoded is None:
+            encoded = self._stdlib_dumps(data, splicer)
+        if splicer.fragments:
+            encoded = splicer.splice(encoded)
+        # Same \u2028/\u2029 escaping as JSONRenderer, keeps the output a JavaScript subset
+        if b'\xe2\x80\xa8' in encoded or b'\xe2\x80\xa9' in encoded:
+            encoded = encoded.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return encoded
+
+    def _orjson_default(self, splicer: _Splicer):
+        fallback = self.encoder_class().default
+
+        def default(obj):
+            if isinstance(obj, Fragment):
+                if _native_fragment is not None:
+                    return _native_fragment(obj.data)
+                return splicer.placeholder(obj)
+            return fallback(obj)
+        return default
+
+    def _stdlib_dumps(self, data, splicer: _Splicer) -> bytes:
+        class Encoder(self.encoder_class):
+            def default(self, obj):
+                if isinstance(obj, Fragment):
+                    return splicer.placeholder(obj)
+                return super().default(obj)
+
+        separators = (',', ':') if self.compact else (', ', ': ')
+        return json.dumps(
+            data, cls=Encoder, ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict, separators=separators,
+        ).encode()
+
+
+def _expand_fragments(data):
+    """Decode Fragments back into Python data, for indented output"""
+    if isinstance(data, Fragment):
+        return data.decode()
+    if isinstance(data, dict):
+        return {key: _expand_fragments(value) for key, value in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [_expand_fragments(item) for item in data]
+    return data
@@ -0,0 +1,172 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+
+class SpecRecord:
+    """
+    Typed view of a component's specs JSON, holding only the attributes the
+    compatibility rules read. `fields` lists (attribute, default) pairs; the
+    defaults match what the rules assume when a key is missing.
+    """
+    __slots__ = ()
+    fields = ()
+    # Keys the rules cannot do without, checked by validate_specs()
+    required = ()
+
+    def __init__(self, specs: Dict[str, Any]):
+        for name, default in self.fields:
+            setattr(self, name, specs.get(name, default))
+
+    def __repr__(self):
+        values = ', '.join(f'{name}={getattr(self, name)!r}' for name, _ in self.fields)
+        return f'{self.__class__.__name__}({values})'
+
+
+class CpuSpecs(SpecRecord):
+    __slots__ = ('socket', 'cores', 'threads', 'tdp')
+    fields = (('socket', None), ('cores', None), ('threads', None), ('tdp', 0))
+    required = ('socket',)
+
+
+class MotherboardSpecs(SpecRecord):
+    __slots__ = ('socket', 'form_factor')
+    fields = (('socket', None), ('form_factor', 'ATX'))
+    required = ('socket',)
+
+
+class GpuSpecs(SpecRecord):
+    __slots__ = ('length', 'tdp')
+    fields = (('length', 0), ('tdp', 0))
+
+
+class PsuSpecs(SpecRecord):
+    __slots__ = ('wattage', 'form_factor')
+    fields = (('wattage', 0), ('form_factor', None))
+
+
+class CaseSpecs(SpecRecord):
+    __slots__ = ('form_factor', 'max_gpu_length', 'max_cpu_cooler_height')
+    fields = (('form_factor', 'ATX'), ('max_gpu_length', 0), ('max_cpu_cooler_height', 0))
+
+
+class CoolerSpecs(SpecRecord):
+    __slots__ = ('height', 'sockets')
+    fields = (('height', 0), ('sockets', None))
+
+
+# Category slug -> record type; other categories get an empty SpecRecord
+SPEC_RECORDS = {
+    'cpu': CpuSpecs,
+    'motherboard': MotherboardSpecs,
+    'gpu': GpuSpecs,
+    'psu': PsuSpecs,
+    'case': CaseSpecs,
+    'cooler': CoolerSpecs,
+}
+
+
+_NUMBER = (int, float)
+
+# Expected type of each record field's value, for validate_specs()
+SPEC_TYPES = {
+    'socket': str,
+    'form_factor': str,
+    'sockets': list,
+    'cores': int,
+    'threads': int,
+    'tdp': _NUMBER,
+    'length': _NUMBER,
+    'wattage': _NUMBER,
+    'height': _NUMBER,
+    'max_gpu_length': _NUMBER,
+    'max_cpu_cooler_height': _NUMBER,
+}
+
+
+def validate_specs(category_slug: str, specs: Dict[str, Any]) -> List[str]:
+    """
+    Problems that would trip up the compatibility rules, e.g. a missing CPU
+    socket or a GPU length given as "300mm". Keys the rules do not read are
+    not checked.
+    """
+    if not isinstance(specs, dict):
+        return ['specs must be a JSON object']
+    record_type = SPEC_RECORDS.get(category_slug, SpecRecord)
+    errors = [f"missing '{name}'" for name in record_type.required if specs.get(name) is None]
+    for name, _ in record_type.fields:
+        value = specs.get(name)
+        expected = SPEC_TYPES.get(name)
+        if value is None or expected is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, expected):
+            errors.append(f"'{name}' has the wrong type ({type(value).__name__})")
+    return errors
+
+
+def parse_specs(specs) -> Dict[str, Any]:
+    """Decode a specs column value; tolerates already-parsed and double-encoded values"""
+    while isinstance(specs, str):
+        specs = json.loads(specs)
+    return specs if isinstance(specs, dict) else {}
+
+
+def build_record(category_slug: str, specs) -> SpecRecord:
+    return SPEC_RECORDS.get(category_slug, SpecRecord)(parse_specs(specs))
+
+
+class SpecCache:
+    """
+    LRU cache of SpecRecords keyed by component id.
+
+    Each entry remembers the raw specs string it was built from, so a row
+    that changed in the database is re-parsed on its next lookup even when
+    nobody called invalidate().
+    """
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # component id -> (category, raw specs, record)
+        self._lock = threading.Lock()
+
+    def get(self, component: Dict[str, Any]) -> SpecRecord:
+        raw = component['specs']
+        category = component['category_slug']
+        if not isinstance(raw, str):
+            return build_record(category, raw)
+
+        component_id = component['id']
+        with self._lock:
+            entry = self._entries.get(component_id)
+            if entry is not None and entry[0] == category and entry[1] == raw:
+                self._entries.move_to_end(component_id)
+                return entry[2]
+
+        record = build_record(category, raw)
+        with self._lock:
+            self._entries[component_id] = (category, raw, record)
+            self._entries.move_to_end(component_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return record
+
+    def invalidate(self, component_id: Optional[int] = None):
+        """Forget one component, or everything when no id is given"""
+        with self._lock:
+            if component_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(component_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+spec_cache = SpecCache(getattr(settings, 'SPEC_CACHE_SIZE', 10000))
+
+
+def invalidate_component_specs(sender=None, instance=None, **kwargs):
+    """post_save/post_delete receiver for Component"""
+    spec_cache.invalidate(instance.pk if instance is not None else None)
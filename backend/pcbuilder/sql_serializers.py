@@ -60,6 +60,21 @@ class BuildComponentSerializer(serializers.Serializer):
     vendor_name = serializers.CharField(read_only=True)
     vendor_website = serializers.URLField(read_only=True)
 
+class BuildComponentOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'remove', 'quantity'])
+    component_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, required=False)
+    notes = serializers.CharField(max_length=200, required=False, allow_blank=True)
+
+    def validate(self, data):
+        if data['op'] == 'quantity' and 'quantity' not in data:
+            raise serializers.ValidationError({'quantity': 'This field is required for quantity operations.'})
+        return data
+
+class BulkBuildComponentSerializer(serializers.Serializer):
+    operations = BuildComponentOperationSerializer(many=True, allow_empty=False, max_length=100)
+    compatibility = serializers.BooleanField(default=False)
+
 class BuildSerializer(serializers.Serializer):
     id = serializers.IntegerField(read_only=True)
     user_id = serializers.IntegerField(read_only=True)
@@ -71,6 +86,19 @@ class BuildSerializer(serializers.Serializer):
     total_price = serializers.DecimalField(read_only=True, max_digits=12, decimal_places=2)
     components = serializers.ListField(child=BuildComponentSerializer(), read_only=True)
 
+class CompatibilityPartsSerializer(serializers.Serializer):
+    component_ids = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=100)
+
+class CompatibilityCandidatesSerializer(serializers.Serializer):
+    component_ids = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+    category = serializers.CharField(max_length=50, required=False)
+    candidate_ids = serializers.ListField(child=serializers.IntegerField(), required=False, max_length=1000)
+    
+    def validate(self, data):
+        if not data.get('category') and not data.get('candidate_ids'):
+            raise serializers.ValidationError('Either category or candidate_ids is required')
+        return data
+
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField()
@@ -1,3 +1,592 @@
-from django.test import TestCase
+import base64
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from .auth_backend import SimpleUser
+from .catalog_cache import CatalogCache, catalog_cache
+from .catalog_loader import CatalogLoader
+from .compatibility_checker import get_rule_table, invalidate_rule_table
+from .database import BuildDB, CompatibilityMatrixDB, ComponentDB, DatabaseManager, UserDB
+from .fast_serializers import _decimal, build_serializer, component_serializer, public_build_serializer
+from .management.commands.import_catalog import Command as ImportCatalogCommand
+from .models import Category, CompatibilityRule, Component, Vendor
+from .pagination import KeysetPaginator
+from .renderers import Fragment, FastJSONRenderer
+from .sql_serializers import BuildSerializer, ComponentSerializer, PublicBuildSerializer
+from .user_cache import UserCache, user_cache
+from .views import BuildComponentView, BuildViewSet, CategoryViewSet, VendorViewSet
+
+
+def component_row(**overrides):
+    row = {
+        'id': 1, 'name': 'AMD Ryzen 7 7800X3D', 'description': '8-core gaming CPU',
+        'price': 449.99, 'image': 'https://example.com/cpu.png',
+        'specs': '{"socket": "AM5", "tdp": 120}', 'stock': 12,
+        'category_id': 1, 'vendor_id': 2,
+        'category_name': 'CPU', 'category_slug': 'cpu',
+        'vendor_name': 'AMD', 'vendor_website': 'https://amd.com',
+    }
+    row.update(overrides)
+    return row
+
+
+def build_component_row(**overrides):
+    row = {
+        'id': 10, 'build_id': 5, 'component_id': 1, 'quantity': 2, 'notes': '',
+        'component_name': 'AMD Ryzen 7 7800X3D', 'component_description': '8-core gaming CPU',
+        'component_price': 449.99, 'component_image': 'https://example.com/cpu.png',
+        'component_specs': '{"socket": "AM5"}', 'component_stock': 12,
+        'category_name': 'CPU', 'category_slug': 'cpu',
+        'vendor_name': 'AMD', 'vendor_website': 'https://amd.com',
+    }
+    row.update(overrides)
+    return row
+
+
+def build_row(**overrides):
+    row = {
+        'id': 5, 'user_id': 1, 'name': 'Gaming rig', 'description': 'Quiet and fast',
+        'created': '2025-01-02T10:11:12.123456', 'updated': '2025-01-03 08:00:00',
+        'is_public': 1, 'total_price': 899.98,
+        'components': [build_component_row(), build_component_row(id=11, component_price=0.1 + 0.2)],
+    }
+    row.update(overrides)
+    return row
+
+
+class FastSerializerEquivalenceTests(SimpleTestCase):
+    """The compiled serializers must render exactly what the DRF ones do"""
+
+    def assertSameJSON(self, serializer_class, fast_serializer, rows):
+        renderer = JSONRenderer()
+        expected = renderer.render(serializer_class(rows, many=True).data)
+        actual = renderer.render(fast_serializer.serialize_many(rows))
+        self.assertEqual(actual, expected)
+
+    def test_component_rows(self):
+        rows = [
+            component_row(),
+            component_row(id=2, price=1234, stock=0),
+            component_row(id=3, price=0.1 + 0.2, specs='"{\\"socket\\": \\"AM4\\"}"'),
+            component_row(id=4, price='99.995', image=None, specs=None),
+            component_row(id=5, price=12345678.999),
+        ]
+        del rows[1]['stock']
+        del rows[1]['vendor_website']
+        self.assertSameJSON(ComponentSerializer, component_serializer, rows)
+
+    def test_build_rows(self):
+        rows = [
+            build_row(),
+            build_row(id=6, is_public=0, total_price=0, components=[]),
+            build_row(id=7, created='', updated=None, total_price=None, description=''),
+            build_row(id=8, components=[None, build_component_row(notes=None, quantity=1)]),
+        ]
+        del rows[1]['is_public']
+        del rows[2]['description']
+        self.assertSameJSON(BuildSerializer, build_serializer, rows)
+
+    def test_public_build_rows(self):
+        rows = [build_row(user_username='alice'), build_row(id=9, user_username='bob')]
+        del rows[1]['components']
+        self.assertSameJSON(PublicBuildSerializer, public_build_serializer, rows)
+
+    def test_missing_required_key_raises_like_drf(self):
+        row = component_row()
+        del row['name']
+        with self.assertRaises(KeyError):
+            ComponentSerializer(row).data
+        with self.assertRaises(KeyError):
+            component_serializer.to_representation(row)
+
+    def test_decimal_fields_without_normalize_output(self):
+        # DRF < 3.15 has no normalize_output
+        field = serializers.DecimalField(max_digits=10, decimal_places=2)
+        del field.normalize_output
+        self.assertEqual(_decimal(field)(Decimal('12.5')), '12.50')
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    data = {
+        'name': 'Läufer\u2028\u2029 “quoted”',
+        'price': Decimal('12.50'),
+        'created': datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        'items': [1, 2.5, None, True, {'nested': 'value'}],
+    }
+
+    def test_matches_json_renderer(self):
+        expected = JSONRenderer().render(self.data)
+        self.assertEqual(FastJSONRenderer().render(self.data), expected)
+        with mock.patch('pcbuilder.renderers.orjson', None):
+            self.assertEqual(FastJSONRenderer().render(self.data), expected)
+
+    def test_data_orjson_cannot_encode_uses_the_stdlib(self):
+        data = {'id': 2 ** 70, 'items': Fragment.encode([1, 2])}
+        self.assertEqual(FastJSONRenderer().render(data), b'{"id":%d,"items":[1,2]}' % 2 ** 70)
+
+    def test_fragments_are_spliced_in(self):
+        fragment = Fragment.encode(self.data['items'])
+        rendered = FastJSONRenderer().render({'next': None, 'results': fragment})
+        self.assertEqual(rendered, JSONRenderer().render({'next': None, 'results': self.data['items']}))
+        self.assertIs(FastJSONRenderer().render(fragment), fragment.data)
+
+
+@override_settings(CATALOG_CACHE_ALIAS='')
+class CatalogWarmupTests(SimpleTestCase):
+    categories = [{'id': 1, 'name': 'CPU', 'slug': 'cpu', 'icon': 'cpu'}]
+    vendors = [{'id': 1, 'name': 'AMD', 'website': 'https://amd.com', 'logo': ''}]
+
+    def setUp(self):
+        self.cache = CatalogCache()
+        for name, value in (
+            ('DataVersionDB', mock.Mock(**{'return_value.get_version.return_value': 1})),
+            ('CategoryDB', mock.Mock(**{'return_value.get_all_categories.return_value': self.categories})),
+            ('VendorDB', mock.Mock(**{'return_value.get_all_vendors.return_value': self.vendors})),
+            ('ComponentDB', mock.Mock(**{'return_value.get_components_page.return_value': []})),
+        ):
+            patcher = mock.patch(f'pcbuilder.catalog_cache.{name}', value)
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch('pcbuilder.views.catalog_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_list_views_are_served_from_warmed_cache(self):
+        self.cache.warm()
+        self.CategoryDB.return_value.get_all_categories.reset_mock()
+        self.VendorDB.return_value.get_all_vendors.reset_mock()
+
+        factory = APIRequestFactory()
+        for view, path, expected in (
+            (CategoryViewSet, '/api/categories/', self.categories),
+            (VendorViewSet, '/api/vendors/', self.vendors),
+        ):
+            response = view.as_view({'get': 'list'})(factory.get(path))
+            response.render()
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, JSONRenderer().render(expected))
+
+        self.CategoryDB.return_value.get_all_categories.assert_not_called()
+        self.VendorDB.return_value.get_all_vendors.assert_not_called()
+
+
+class BuildOwnershipTests(SimpleTestCase):
+    """Builds belong to the user who created them; only that user can change their parts"""
+    operations = {'operations': [{'op': 'add', 'component_id': 1}]}
+    alice = SimpleNamespace(id=1, is_authenticated=True)
+    bob = SimpleNamespace(id=2, is_authenticated=True)
+
+    def setUp(self):
+        self.builds = {}
+
+        def create_build(user_id, name, description='', is_public=True):
+            build_id = len(self.builds) + 1
+            self.builds[build_id] = build_row(id=build_id, user_id=user_id, name=name)
+            return build_id
+
+        self.build_db = mock.Mock(**{
+            'create_build.side_effect': create_build,
+            'get_build_by_id.side_effect': lambda build_id: dict(self.builds[build_id]) if build_id in self.builds else None,
+        })
+        self.build_component_db = mock.Mock(**{
+            'apply_operations.return_value': [],
+            'get_build_components.return_value': [],
+            'remove_component_from_build.return_value': True,
+        })
+        for name, value in (('BuildDB', self.build_db), ('BuildComponentDB', self.build_component_db)):
+            patcher = mock.patch(f'pcbuilder.views.{name}', return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def call(self, view, method, path, user=None, data=None, **kwargs):
+        request = getattr(APIRequestFactory(), method)(path, data, format='json')
+        if user is not None:
+            force_authenticate(request, user=user)
+        return view(request, **kwargs)
+
+    def create(self, user=None):
+        return self.call(BuildViewSet.as_view({'post': 'create'}), 'post', '/api/builds/', user,
+                         {'name': 'Gaming rig'})
+
+    def patch(self, build_id, user=None):
+        return self.call(BuildComponentView.as_view(), 'patch', f'/api/builds/{build_id}/components/', user,
+                         self.operations, build_id=build_id)
+
+    def test_build_is_owned_by_its_creator_who_can_patch_it(self):
+        response = self.create(self.bob)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['user_id'], self.bob.id)
+
+        response = self.patch(response.data['id'], self.bob)
+        self.assertEqual(response.status_code, 200)
+        self.build_component_db.apply_operations.assert_called_once()
+
+    def test_anonymous_requests_are_refused(self):
+        self.assertIn(self.create().status_code, (401, 403))
+        self.build_db.create_build.assert_not_called()
+        build_id = self.create(self.alice).data['id']
+        self.assertIn(self.patch(build_id).status_code, (401, 403))
+        self.build_component_db.apply_operations.assert_not_called()
+
+    def test_other_users_cannot_change_the_parts(self):
+        build_id = self.create(self.alice).data['id']
+        path = f'/api/builds/{build_id}/components/'
+        view = BuildComponentView.as_view()
+        self.assertEqual(self.patch(build_id, self.bob).status_code, 404)
+        self.assertEqual(self.call(view, 'post', path, self.bob, {'component_id': 1}, build_id=build_id).status_code, 404)
+        self.assertEqual(self.call(view, 'delete', f'{path}1/', self.bob, build_id=build_id, component_id=1).status_code, 404)
+        self.build_component_db.apply_operations.assert_not_called()
+        self.build_component_db.add_component_to_build.assert_not_called()
+        self.build_component_db.remove_component_from_build.assert_not_called()
+
+
+class KeysetPaginatorCursorTests(SimpleTestCase):
+    def paginator(self, cursor):
+        request = Request(APIRequestFactory().get('/api/components/', {'cursor': cursor}))
+        return KeysetPaginator(request, ['category_id', 'price', 'id'])
+
+    def encode(self, payload: bytes) -> str:
+        return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+    def test_round_trip(self):
+        paginator = self.paginator('')
+        cursor = paginator.encode_cursor({'category_id': 1, 'price': 99.5, 'id': 7}, reverse=True)
+        self.assertEqual(paginator.decode_cursor(cursor), {'key': (1, 99.5, 7), 'reverse': True})
+
+    def test_crafted_cursors_are_rejected(self):
+        fetch = mock.Mock(return_value=[])
+        for payload in (b'{"k":[{},1]}', b'{"k":[1,[2],3]}', b'{"k":[1,2]}', b'[1]', b'not json'):
+            with self.subTest(payload=payload), self.assertRaises(NotFound):
+                self.paginator(self.encode(payload)).paginate(fetch)
+        fetch.assert_not_called()
+
+
+class UserCacheTests(SimpleTestCase):
+    def test_changed_users_are_dropped_when_the_version_moves(self):
+        with mock.patch('pcbuilder.user_cache.DataVersionDB') as data_version_db:
+            get_version = data_version_db.return_value.get_version
+            get_version.return_value = 1
+            cache = UserCache(ttl=60.0, check_interval=0)
+            self.assertIsNone(cache.get(1))
+            cache.set(1, 'alice')
+            self.assertEqual(cache.get(1), 'alice')
+
+            # e.g. the user was deactivated by another process
+            get_version.return_value = 2
+            self.assertIsNone(cache.get(1))
+            get_version.assert_called_with('users')
+
+
+class DatabaseTestCase(TransactionTestCase):
+    """
+    Runs against the migrated test database, through both the ORM and the raw
+    SQL layer. TransactionTestCase, since the raw layer commits on its own
+    connections where TestCase's per-test transaction cannot roll it back.
+    """
+    def setUp(self):
+        # Ids are reused once the tables are flushed between tests
+        catalog_cache.invalidate()
+        user_cache.invalidate()
+        invalidate_rule_table()
+        self.addCleanup(DatabaseManager().pool.release)
+        # Start from an empty catalog, whether or not the seeded one was flushed yet
+        Category.objects.all().delete()
+        Vendor.objects.all().delete()
+        self.category = Category.objects.create(name='Test CPU', slug='test-cpu')
+        self.vendor = Vendor.objects.create(name='Test Vendor', website='https://example.com')
+
+    def create_component(self, name, price, specs=None, **fields):
+        return Component.objects.create(
+            name=name, description=f'{name} description', price=Decimal(price), category=self.category,
+            vendor=self.vendor, image='https://example.com/part.png', specs=specs or {}, **fields,
+        )
+
+    def create_user(self, username):
+        user_db = UserDB()
+        user_id = user_db.create_user(username, f'{username}@example.com', 'correct horse battery')
+        # pcbuilder_user has no model, so the flush between tests leaves it alone
+        self.addCleanup(DatabaseManager().execute_update, "DELETE FROM pcbuilder_user WHERE id = ?", (user_id,))
+        return SimpleUser(user_db.get_user_by_id(user_id))
+
+
+class BuildTotalTests(DatabaseTestCase):
+    """Totals are adjusted incrementally; they must always equal a full recompute"""
+
+    def setUp(self):
+        super().setUp()
+        self.cpu = self.create_component('Test CPU A', '199.99')
+        self.cooler = self.create_component('Test Cooler', '35.50')
+        self.fan = self.create_component('Test Fan', '9.95')
+        self.client = APIClient()
+        self.client.force_authenticate(self.create_user('builder'))
+        self.build_id = self.client.post('/api/v1/builds/', {'name': 'Test rig'}, format='json').data['id']
+        self.path = f'/api/v1/builds/{self.build_id}/components/'
+
+    def assertTotal(self, expected):
+        total = BuildDB().get_build_by_id(self.build_id)['total_price']
+        recomputed = DatabaseManager().execute_query(
+            """
+            SELECT COALESCE(SUM(c.price * bc.quantity), 0) AS total
+            FROM pcbuilder_buildcomponent bc
+            JOIN pcbuilder_component c ON bc.component_id = c.id
+            WHERE bc.build_id = ?
+            """,
+            (self.build_id,),
+        )[0]['total']
+        self.assertAlmostEqual(float(total), float(recomputed), places=2)
+        self.assertAlmostEqual(float(total), expected, places=2)
+
+    def test_post_patch_and_delete_keep_the_total(self):
+        self.assertTotal(0)
+        response = self.client.post(self.path, {'component_id': self.cpu.id, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTotal(2 * 199.99)
+
+        response = self.client.patch(self.path, {'operations': [
+            {'op': 'add', 'component_id': self.cooler.id},
+            {'op': 'add', 'component_id': self.fan.id, 'quantity': 3},
+            {'op': 'quantity', 'component_id': self.cpu.id, 'quantity': 1},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTotal(199.99 + 35.50 + 3 * 9.95)
+
+        response = self.client.delete(f'{self.path}{self.fan.id}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertTotal(199.99 + 35.50)
+
+    def test_failed_patch_changes_nothing(self):
+        self.client.post(self.path, {'component_id': self.cpu.id}, format='json')
+        response = self.client.patch(self.path, {'operations': [
+            {'op': 'add', 'component_id': self.cooler.id},
+            {'op': 'remove', 'component_id': self.fan.id},  # not in the build
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTotal(199.99)
+        components = self.client.get(f'/api/v1/builds/{self.build_id}/').data['components']
+        self.assertEqual([component['component_id'] for component in components], [self.cpu.id])
+
+    def test_price_change_is_repriced(self):
+        self.client.post(self.path, {'component_id': self.cooler.id, 'quantity': 2}, format='json')
+        Component.objects.filter(pk=self.cooler.pk).update(price=Decimal('40.00'))
+        self.assertEqual(BuildDB().update_total_prices_for_components([self.cooler.id]), 1)
+        self.assertTotal(80.00)
+
+
+class TransactionTests(DatabaseTestCase):
+    def count(self):
+        return Vendor.objects.filter(name__startswith='Rolled back').count()
+
+    def insert_vendor(self, name):
+        DatabaseManager().execute_insert(
+            "INSERT INTO pcbuilder_vendor (name, website, logo) VALUES (?, '', '')", (name,)
+        )
+
+    def test_nested_blocks_commit_together(self):
+        db = DatabaseManager()
+        with db.transaction():
+            self.insert_vendor('Rolled back 1')
+            with db.transaction():
+                self.insert_vendor('Rolled back 2')
+            self.assertTrue(db.in_transaction())
+        self.assertFalse(db.in_transaction())
+        self.assertEqual(self.count(), 2)
+
+    def test_error_in_a_nested_block_rolls_back_the_outer_one(self):
+        db = DatabaseManager()
+        with self.assertRaises(RuntimeError):
+            with db.transaction():
+                self.insert_vendor('Rolled back 1')
+                with db.transaction():
+                    self.insert_vendor('Rolled back 2')
+                    raise RuntimeError
+        self.assertFalse(db.in_transaction())
+        self.assertEqual(self.count(), 0)
+
+
+class ComponentUpdateTests(DatabaseTestCase):
+    """Triggers keep the compatibility matrix and the search index in step with component edits"""
+
+    def setUp(self):
+        super().setUp()
+        motherboards = Category.objects.create(name='Motherboard', slug='motherboard')
+        self.category = Category.objects.create(name='CPU', slug='cpu')
+        CompatibilityRule.objects.create(source=self.category, target=motherboards, condition={'rule': 'socket_match'})
+        self.cpu = self.create_component('Zen Test 9700X', '329.00', {'socket': 'AM5'})
+        self.category = motherboards
+        self.board = self.create_component('Test B650 Board', '189.00', {'socket': 'AM5'})
+
+    def pair(self):
+        return CompatibilityMatrixDB().get_pair(self.cpu.id, self.board.id, get_rule_table().version)
+
+    def search(self, term):
+        return [row['id'] for row in ComponentDB().search_components(term)]
+
+    def test_matrix_follows_spec_changes(self):
+        self.assertTrue(self.pair()['compatible'])
+
+        # Saved through the ORM (e.g. the admin): pairs are dropped and recomputed
+        self.board.specs = {'socket': 'LGA1700'}
+        self.board.save()
+        self.assertFalse(self.pair()['compatible'])
+
+        # Written behind Django's back: the trigger still drops the stale pair
+        DatabaseManager().execute_update(
+            "UPDATE pcbuilder_component SET specs = ? WHERE id = ?", ('{"socket": "AM5"}', self.board.id)
+        )
+        self.assertIsNone(self.pair())
+
+    def test_price_change_keeps_the_pairs(self):
+        DatabaseManager().execute_update(
+            "UPDATE pcbuilder_component SET price = 179.0 WHERE id = ?", (self.board.id,)
+        )
+        self.assertTrue(self.pair()['compatible'])
+
+    def test_search_index_follows_edits(self):
+        self.assertEqual(self.search('Zen Test'), [self.cpu.id])
+
+        self.cpu.name = 'Granite Test 9700X'
+        self.cpu.description = 'Renamed part'
+        self.cpu.save()
+        self.assertEqual(self.search('Zen Test'), [])
+        self.assertEqual(self.search('Granite'), [self.cpu.id])
+
+        self.vendor.name = 'Renamed Vendor'
+        self.vendor.save()
+        self.assertEqual(self.search('Renamed Granite'), [self.cpu.id])
+
+        self.cpu.delete()
+        self.assertEqual(self.search('Granite'), [])
+
+
+class ImportCatalogTests(DatabaseTestCase):
+    """import_catalog resumes from its checkpoint and, with --sync, only writes what changed"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'feed.jsonl')
+        self.checkpoint = f'{self.path}.checkpoint'
+        self.records = [
+            {'name': f'Feed CPU {n}', 'price': 100.0 + n, 'category_slug': 'test-cpu',
+             'vendor_name': 'Test Vendor', 'specs': {}}
+            for n in range(5)
+        ]
+        self.write_feed()
+
+    def write_feed(self):
+        with open(self.path, 'w') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + '\n')
+
+    def run_import(self, *args):
+        out = StringIO()
+        call_command('import_catalog', self.path, '--batch-size', '2', *args, stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+    def prices(self):
+        return dict(Component.objects.filter(name__startswith='Feed CPU').values_list('name', 'price'))
+
+    def test_resumes_from_the_checkpoint(self):
+        # Fail on the second batch, after the first one was committed
+        write_rows = CatalogLoader.write_rows
+        calls = []
+
+        def failing_write_rows(loader, rows, stats, sync=False):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+            return write_rows(loader, rows, stats, sync)
+
+        with mock.patch.object(CatalogLoader, 'write_rows', failing_write_rows):
+            with self.assertRaises(RuntimeError):
+                self.run_import()
+        self.assertEqual(len(self.prices()), 2)
+        with open(self.checkpoint) as f:
+            self.assertEqual(json.load(f)['stats']['records'], 2)
+
+        output = self.run_import()
+        self.assertIn('Resuming at byte', output)
+        self.assertIn('Imported 5 records', output)
+        self.assertEqual(len(self.prices()), 5)
+        self.assertFalse(os.path.exists(self.checkpoint))
+        # Rows of both runs were added to the search index
+        found = [row['id'] for row in ComponentDB().search_components('Feed CPU')]
+        self.assertCountEqual(found, Component.objects.values_list('id', flat=True))
+
+    def test_modified_feed_refuses_a_stale_checkpoint(self):
+        ImportCatalogCommand().write_checkpoint(self.checkpoint, self.path, 0, {}, 0)
+        self.records.append({**self.records[0], 'name': 'Feed CPU 5'})
+        self.write_feed()
+        os.utime(self.path, (0, 0))
+        with self.assertRaises(CommandError):
+            self.run_import()
+        self.assertIn('Imported 6 records', self.run_import('--restart'))
+
+    def test_sync_only_writes_changed_records(self):
+        output = self.run_import('--sync')
+        self.assertIn('5 inserted or changed', output)
+        self.assertIn('Sync: 0 unchanged', output)
+        hashes = DatabaseManager().execute_query("SELECT COUNT(*) AS n FROM pcbuilder_componenthash")[0]['n']
+        self.assertEqual(hashes, 5)
+
+        output = self.run_import('--sync')
+        self.assertIn('0 inserted or changed', output)
+        self.assertIn('Sync: 5 unchanged, 0 build totals refreshed', output)
+
+        client = APIClient()
+        client.force_authenticate(self.create_user('syncer'))
+        build_id = client.post('/api/v1/builds/', {'name': 'Synced rig'}, format='json').data['id']
+        part = Component.objects.get(name='Feed CPU 3')
+        client.post(f'/api/v1/builds/{build_id}/components/', {'component_id': part.id, 'quantity': 2}, format='json')
+
+        self.records[3]['price'] = 90.0
+        self.records[4]['specs'] = {'note': 'revised'}
+        self.write_feed()
+        output = self.run_import('--sync')
+        self.assertIn('2 inserted or changed', output)
+        self.assertIn('Sync: 3 unchanged, 1 build totals refreshed', output)
+        self.assertEqual(self.prices()['Feed CPU 3'], Decimal('90.00'))
+        self.assertAlmostEqual(float(BuildDB().get_build_by_id(build_id)['total_price']), 180.0, places=2)
+
+
+class CompatibilityCandidatesTests(DatabaseTestCase):
+    """A whole category is checked a page at a time"""
+
+    def test_category_is_paginated(self):
+        parts = [self.create_component(f'Candidate {n}', f'{100 + n}.00') for n in range(5)]
+        client = APIClient()
+        body = {'component_ids': [parts[0].id], 'category': 'test-cpu'}
+
+        seen = []
+        url = '/api/v1/compatibility/candidates/?page_size=2'
+        while url:
+            response = client.post(url, body, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['candidates']), 2)
+            seen += [candidate['component_id'] for candidate in response.data['candidates']]
+            url = response.data['next']
+        self.assertEqual(seen, [part.id for part in parts])
+
+    def test_candidate_ids_are_not_paginated(self):
+        parts = [self.create_component(f'Candidate {n}', f'{100 + n}.00') for n in range(3)]
+        response = APIClient().post('/api/v1/compatibility/candidates/?page_size=1', {
+            'candidate_ids': [part.id for part in parts],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['candidates']), 3)
+        self.assertIsNone(response.data['next'])
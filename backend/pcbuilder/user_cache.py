@@ -0,0 +1,83 @@
+import threading
+import time
+from typing import Any, Optional
+
+from django.conf import settings
+
+from .database import DataVersionDB
+
+
+class UserCache:
+    """
+    Short-lived per-process cache of authenticated users, keyed by user id.
+
+    Entries are also dropped when the 'users' version counter moves, which
+    triggers bump on every update or delete of a user row (migration 0013).
+    The counter is re-read at most every `check_interval` seconds, so an
+    edited or deactivated user is noticed within that time by every worker,
+    whichever process made the change; the TTL is only a backstop.
+    """
+    def __init__(self, ttl: float = 60.0, max_size: int = 10000, check_interval: float = 5.0):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.check_interval = check_interval
+        self.version = None
+        self.checked_at = 0.0
+        self._entries = {}  # user id -> (expires at, user)
+        self._lock = threading.Lock()
+
+    def check_version(self):
+        """Drop every entry if a user changed since the last check"""
+        if self.version is not None and time.monotonic() - self.checked_at < self.check_interval:
+            return
+        version = DataVersionDB().get_version('users')
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            self.checked_at = time.monotonic()
+
+    def get(self, user_id: int) -> Optional[Any]:
+        if self.ttl <= 0:
+            return None
+        self.check_version()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            return entry[1]
+
+    def set(self, user_id: int, user: Any):
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_size and user_id not in self._entries:
+                expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+                for key in expired:
+                    del self._entries[key]
+                if len(self._entries) >= self.max_size:
+                    # Dicts keep insertion order, so this drops the oldest entry
+                    del self._entries[next(iter(self._entries))]
+            self._entries[user_id] = (now + self.ttl, user)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Forget one user, or everyone when no id is given"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+user_cache = UserCache(
+    getattr(settings, 'AUTH_USER_CACHE_TTL', 60.0),
+    getattr(settings, 'AUTH_USER_CACHE_SIZE', 10000),
+    getattr(settings, 'AUTH_USER_CACHE_CHECK_INTERVAL', 5.0),
+)
@@ -1,9 +1,16 @@
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .sql_serializers import *
 from .database import UserDB, CategoryDB, VendorDB, ComponentDB, BuildDB, BuildComponentDB, PublicBuildDB
 from .compatibility_checker import CompatibilityChecker
+from .pagination import KeysetPaginator
+from .autocomplete import autocomplete
+from .catalog_cache import catalog_cache, components_page_key
+from .conditional import conditional
+from .fast_serializers import build_serializer, component_serializer, public_build_serializer
+from .renderers import Fragment
 from django.contrib.auth.hashers import check_password
 from rest_framework_simplejwt.tokens import RefreshToken
 from drf_yasg.utils import swagger_auto_schema
@@ -12,6 +19,26 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         return obj['user_id'] == request.user.id
 
+def catalog_state(view, request, *args, **kwargs):
+    return ('catalog', catalog_cache.current_version(), request.get_full_path())
+
+def public_builds_state(view, request, *args, **kwargs):
+    state = PublicBuildDB().get_public_builds_state()
+    return ('public_builds', state['updated'], state['build_count'],
+            catalog_cache.current_version(), request.get_full_path())
+
+def public_build_state(view, request, pk=None):
+    build = BuildDB().get_build_by_id(int(pk))
+    if not build or not build['is_public']:
+        return None
+    return ('public_build', build['id'], build['updated'], catalog_cache.current_version())
+
+def own_build_state(view, request, pk=None):
+    build = BuildDB().get_build_by_id(int(pk))
+    if not build or build['user_id'] != request.user.id:
+        return None
+    return ('build', build['id'], build['updated'], catalog_cache.current_version())
+
 class UserViewSet(viewsets.ViewSet):
     permission_classes = []
     
@@ -20,9 +47,10 @@ class UserViewSet(viewsets.ViewSet):
         self.user_db = UserDB()
     
     def list(self, request):
-        users = self.user_db.get_all_users()
+        paginator = KeysetPaginator(request, ['id'])
+        users = paginator.paginate(self.user_db.get_users_page)
         serializer = UserSerializer(users, many=True)
-        return Response(serializer.data)
+        return Response(paginator.get_paginated_data(serializer.data))
     
     def retrieve(self, request, pk=None):
         user = self.user_db.get_user_by_id(int(pk))
@@ -40,7 +68,7 @@ class CurrentUserView(APIView):
 
     def get(self, request):
         if request.user.is_authenticated:
-            user = self.user_db.get_user_by_id(request.user.id)
+            user = request.user.get_user_data(self.user_db)
             if user:
                 serializer = UserSerializer(user)
                 return Response(serializer.data)
@@ -53,13 +81,13 @@ class CategoryViewSet(viewsets.ViewSet):
         super().__init__(**kwargs)
         self.category_db = CategoryDB()
     
+    @conditional(catalog_state)
     def list(self, request):
-        categories = self.category_db.get_all_categories()
-        serializer = CategorySerializer(categories, many=True)
-        return Response(serializer.data)
+        return Response(catalog_cache.categories_fragment())
     
+    @conditional(catalog_state)
     def retrieve(self, request, pk=None):
-        category = self.category_db.get_category_by_id(int(pk))
+        category = catalog_cache.get(('category', int(pk)), lambda: self.category_db.get_category_by_id(int(pk)))
         if category:
             serializer = CategorySerializer(category)
             return Response(serializer.data)
@@ -72,18 +100,37 @@ class VendorViewSet(viewsets.ViewSet):
         super().__init__(**kwargs)
         self.vendor_db = VendorDB()
     
+    @conditional(catalog_state)
     def list(self, request):
-        vendors = self.vendor_db.get_all_vendors()
-        serializer = VendorSerializer(vendors, many=True)
-        return Response(serializer.data)
+        return Response(catalog_cache.vendors_fragment())
     
+    @conditional(catalog_state)
     def retrieve(self, request, pk=None):
-        vendor = self.vendor_db.get_vendor_by_id(int(pk))
+        vendor = catalog_cache.get(('vendor', int(pk)), lambda: self.vendor_db.get_vendor_by_id(int(pk)))
         if vendor:
             serializer = VendorSerializer(vendor)
             return Response(serializer.data)
         return Response({'error': 'Vendor not found'}, status=404)
 
+def parse_component_filters(query_params) -> dict:
+    """
+    Read catalog filters from the query string: ?socket=AM5,LGA1700 for
+    value filters, ?wattage_min=650&wattage_max=1000 for ranges.
+    Raises ValueError for non-numeric range bounds.
+    """
+    filters = {}
+    for name, (_, kind) in ComponentDB.FILTERS.items():
+        if kind == 'values':
+            raw = query_params.get(name)
+            values = [value.strip() for value in raw.split(',') if value.strip()] if raw else []
+            if values:
+                filters[name] = values
+        else:
+            bounds = tuple(query_params.get(f'{name}_{end}') for end in ('min', 'max'))
+            if any(bounds):
+                filters[name] = tuple(float(bound) if bound else None for bound in bounds)
+    return filters
+
 class ComponentViewSet(viewsets.ViewSet):
     permission_classes = []
     
@@ -91,24 +138,72 @@ class ComponentViewSet(viewsets.ViewSet):
         super().__init__(**kwargs)
         self.component_db = ComponentDB()
     
+    @conditional(catalog_state)
     def list(self, request):
+        category = request.query_params.get('category') or None
+        try:
+            filters = parse_component_filters(request.query_params)
+        except ValueError:
+            return Response({'error': 'Range filters must be numbers'}, status=400)
+        paginator = KeysetPaginator(request, ['category_id', 'price', 'id'])
+        components = paginator.paginate(
+            lambda limit, after=None, before=None: catalog_cache.get(
+                components_page_key(limit, after, before, category, filters),
+                lambda: self.component_db.get_components_page(
+                    limit, after, before, category_slug=category, filters=filters
+                )
+            )
+        )
+        # The encoded page is cached too, so only the envelope is encoded per request
+        results = catalog_cache.get(
+            ('components', 'json', request.get_full_path()),
+            lambda: Fragment.encode(component_serializer.serialize_many(components))
+        )
+        data = paginator.get_paginated_data(results)
+        if request.query_params.get('facets'):
+            data['facets'] = catalog_cache.get(
+                ('facets', category, sorted(filters.items())),
+                lambda: self.component_db.get_facets(category, filters)
+            )
+        return Response(data)
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Full-text search over name, description, vendor and specs (?q=, ?category=)"""
+        search_term = request.query_params.get('q', '').strip()
+        if not search_term:
+            return Response({'error': 'q parameter is required'}, status=400)
         category = request.query_params.get('category')
-        if category:
-            components = self.component_db.get_components_by_category(category)
-        else:
-            components = self.component_db.get_all_components()
-        serializer = ComponentSerializer(components, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPaginator(request, ['rank', 'id'])
+        components = paginator.paginate(
+            lambda limit, **bounds: self.component_db.search_components_page(
+                search_term, limit, category_slug=category or None, **bounds
+            )
+        )
+        return Response(paginator.get_paginated_data(component_serializer.serialize_many(components)))
+    
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """Component and vendor name completions for a typed prefix (?q=, ?limit=)"""
+        prefix = request.query_params.get('q', '').strip()
+        if not prefix:
+            return Response({'components': [], 'vendors': []})
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            limit = 10
+        return Response(autocomplete.suggest(prefix, limit))
     
+    @conditional(catalog_state)
     def retrieve(self, request, pk=None):
-        component = self.component_db.get_component_by_id(int(pk))
+        component = catalog_cache.get(('component', int(pk)), lambda: self.component_db.get_component_by_id(int(pk)))
         if component:
             serializer = ComponentSerializer(component)
             return Response(serializer.data)
         return Response({'error': 'Component not found'}, status=404)
 
 class BuildViewSet(viewsets.ViewSet):
-    permission_classes = []  # Temporarily remove authentication requirement
+    permission_classes = [permissions.IsAuthenticated]
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -117,22 +212,18 @@ class BuildViewSet(viewsets.ViewSet):
     
     def list(self, request):
         builds = self.build_db.get_user_builds(request.user.id)
-        # Add components to each build
+        # Add components to each build, loaded in a single query
+        components = self.build_component_db.get_components_for_builds([b['id'] for b in builds])
         for build in builds:
-            components = self.build_component_db.get_build_components(build['id'])
-            build['components'] = components
+            build['components'] = components[build['id']]
         
-        serializer = BuildSerializer(builds, many=True)
-        return Response(serializer.data)
+        return Response(build_serializer.serialize_many(builds))
     
     def create(self, request):
         serializer = BuildSerializer(data=request.data)
         if serializer.is_valid():
-            # For now, just use user ID 1 as default
-            user_id = 1
-            
             build_id = self.build_db.create_build(
-                user_id=user_id,
+                user_id=request.user.id,
                 name=serializer.validated_data['name'],
                 description=serializer.validated_data.get('description', ''),
                 is_public=serializer.validated_data.get('is_public', True)
@@ -143,6 +234,7 @@ class BuildViewSet(viewsets.ViewSet):
             return Response(serializer.data, status=201)
         return Response(serializer.errors, status=400)
     
+    @conditional(own_build_state)
     def retrieve(self, request, pk=None):
         build = self.build_db.get_build_by_id(int(pk))
         if build and build['user_id'] == request.user.id:
@@ -184,7 +276,7 @@ class BuildViewSet(viewsets.ViewSet):
         return Response({'error': 'Failed to delete build'}, status=400)
 
 class BuildComponentView(APIView):
-    permission_classes = []  # Temporarily remove authentication requirement
+    permission_classes = [permissions.IsAuthenticated]
     
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -193,13 +285,13 @@ class BuildComponentView(APIView):
     
     @swagger_auto_schema(request_body=BuildComponentSerializer)
     def post(self, request, build_id):
-        # Temporarily remove user ownership check
         build = self.build_db.get_build_by_id(int(build_id))
-        if not build:
+        if not build or build['user_id'] != request.user.id:
             return Response({'error': 'Build not found'}, status=404)
         
         serializer = BuildComponentSerializer(data=request.data)
         if serializer.is_valid():
+            # Also adds the component to the build's total price
             component_id = self.build_component_db.add_component_to_build(
                 build_id=int(build_id),
                 component_id=serializer.validated_data['component_id'],
@@ -207,22 +299,42 @@ class BuildComponentView(APIView):
                 notes=serializer.validated_data.get('notes', '')
             )
             
-            # Update build total price
-            self.build_db.update_build_total_price(int(build_id))
-            
             return Response({'message': 'Component added to build'}, status=201)
         return Response(serializer.errors, status=400)
-    
+
+    @swagger_auto_schema(request_body=BulkBuildComponentSerializer)
+    def patch(self, request, build_id):
+        """Apply a list of add/remove/quantity operations in one transaction"""
+        build = self.build_db.get_build_by_id(int(build_id))
+        if not build or build['user_id'] != request.user.id:
+            return Response({'error': 'Build not found'}, status=404)
+
+        serializer = BulkBuildComponentSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+
+        # Recomputes the build's total price once, after all operations
+        errors = self.build_component_db.apply_operations(int(build_id), serializer.validated_data['operations'])
+        if errors:
+            return Response({'error': 'No changes were applied', 'operations': errors}, status=400)
+
+        build = self.build_db.get_build_by_id(int(build_id))
+        build['components'] = self.build_component_db.get_build_components(build['id'])
+        data = BuildSerializer(build).data
+        if serializer.validated_data['compatibility']:
+            checker = CompatibilityChecker()
+            components = checker.components_from_build_rows(build['components'])
+            data['compatibility'] = checker.check_build_compatibility(components)
+        return Response(data)
+
     def delete(self, request, build_id, component_id):
-        # Temporarily remove user ownership check
         build = self.build_db.get_build_by_id(int(build_id))
-        if not build:
+        if not build or build['user_id'] != request.user.id:
             return Response({'error': 'Build not found'}, status=404)
         
+        # Also takes the component off the build's total price
         success = self.build_component_db.remove_component_from_build(int(build_id), int(component_id))
         if success:
-            # Update build total price
-            self.build_db.update_build_total_price(int(build_id))
             return Response(status=204)
         return Response({'error': 'Component not found in build'}, status=404)
 
@@ -234,19 +346,36 @@ class PublicBuildViewSet(viewsets.ViewSet):
         self.public_build_db = PublicBuildDB()
         self.build_component_db = BuildComponentDB()
     
+    @conditional(public_builds_state)
     def list(self, request):
-        builds = self.public_build_db.get_public_builds()
-        # Add components to each build
+        paginator = KeysetPaginator(request, ['created', 'id'])
+        ids = request.query_params.get('ids')
+        if ids:
+            # Feed hydration: fetch exactly the requested builds
+            try:
+                build_ids = [int(build_id) for build_id in ids.split(',') if build_id.strip()]
+            except ValueError:
+                return Response({'error': 'ids must be a comma-separated list of integers'}, status=400)
+            if len(build_ids) > paginator.max_page_size:
+                return Response({
+                    'error': f'At most {paginator.max_page_size} ids can be requested at once'
+                }, status=400)
+            builds = self.public_build_db.get_public_builds_by_ids(build_ids)
+        else:
+            builds = paginator.paginate(self.public_build_db.get_public_builds_page)
+        # Add components to each build, loaded in a single query
+        components = self.build_component_db.get_components_for_builds([b['id'] for b in builds])
         for build in builds:
-            components = self.build_component_db.get_build_components(build['id'])
-            build['components'] = components
+            build['components'] = components[build['id']]
         
-        serializer = PublicBuildSerializer(builds, many=True)
-        return Response(serializer.data)
+        results = public_build_serializer.serialize_many(builds)
+        if ids:
+            return Response({'next': None, 'previous': None, 'results': results})
+        return Response(paginator.get_paginated_data(results))
     
+    @conditional(public_build_state)
     def retrieve(self, request, pk=None):
-        build = self.public_build_db.get_public_builds()
-        build = next((b for b in build if b['id'] == int(pk)), None)
+        build = self.public_build_db.get_public_build_by_id(int(pk))
         if build:
             components = self.build_component_db.get_build_components(build['id'])
             build['components'] = components
@@ -263,7 +392,10 @@ class CompatibilityView(APIView):
         self.component_db = ComponentDB()
     
     def post(self, request):
-        """Check compatibility between two components"""
+        """Check compatibility between two components, or of a list of parts (component_ids)"""
+        if 'component_ids' in request.data:
+            return self.check_parts(request)
+        
         component1_id = request.data.get('component1_id')
         component2_id = request.data.get('component2_id')
         
@@ -282,6 +414,21 @@ class CompatibilityView(APIView):
                 'error': f'Compatibility check failed: {str(e)}'
             }, status=500)
     
+    def check_parts(self, request):
+        """Check a set of parts that is not saved as a build, e.g. while one is being put together"""
+        serializer = CompatibilityPartsSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        
+        components = self.component_db.get_components_by_ids(serializer.validated_data['component_ids'])
+        try:
+            result = self.compatibility_checker.check_build_compatibility(components)
+            return Response(result)
+        except Exception as e:
+            return Response({
+                'error': f'Build compatibility check failed: {str(e)}'
+            }, status=500)
+    
     def get(self, request):
         """Check compatibility for a build"""
         build_id = request.query_params.get('build_id')
@@ -301,16 +448,56 @@ class CompatibilityView(APIView):
                     'error': 'No components found in build'
                 }, status=404)
             
-            # Convert to component objects for compatibility checker
-            components = []
-            for bc in build_components:
-                component = self.component_db.get_component_by_id(bc['component_id'])
-                if component:
-                    components.append(component)
+            # The joined rows already carry everything the checker needs
+            components = self.compatibility_checker.components_from_build_rows(build_components)
             
             result = self.compatibility_checker.check_build_compatibility(components)
             return Response(result)
         except Exception as e:
             return Response({
                 'error': f'Build compatibility check failed: {str(e)}'
-            }, status=500)
\ No newline at end of file
+            }, status=500)
+
+class CompatibilityCandidatesView(APIView):
+    permission_classes = []
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.compatibility_checker = CompatibilityChecker()
+        self.component_db = ComponentDB()
+    
+    @swagger_auto_schema(request_body=CompatibilityCandidatesSerializer)
+    def post(self, request):
+        """
+        Check which candidate components fit a partial build. A category is
+        checked one page at a time (?page_size=, at most 100); POST the same
+        body to the `next` link for the rest of it.
+        """
+        serializer = CompatibilityCandidatesSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=400)
+        
+        build_components = self.component_db.get_components_by_ids(serializer.validated_data['component_ids'])
+        paginator = None
+        if serializer.validated_data.get('candidate_ids'):
+            candidates = self.component_db.get_components_by_ids(serializer.validated_data['candidate_ids'])
+        else:
+            category = serializer.validated_data['category']
+            paginator = KeysetPaginator(request, ['category_id', 'price', 'id'])
+            candidates = paginator.paginate(
+                lambda limit, after=None, before=None: self.component_db.get_components_page(
+                    limit, after, before, category_slug=category
+                )
+            )
+        
+        try:
+            results = self.compatibility_checker.check_candidates(build_components, candidates)
+        except Exception as e:
+            return Response({
+                'error': f'Candidate compatibility check failed: {str(e)}'
+            }, status=500)
+        return Response({
+            'next': paginator.get_next_link() if paginator else None,
+            'previous': paginator.get_previous_link() if paginator else None,
+            'candidates': results,
+        })
\ No newline at end of file
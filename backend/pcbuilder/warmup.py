@@ -0,0 +1,31 @@
+import logging
+import sqlite3
+
+from django.conf import settings
+
+from .database import close_all_pools
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """
+    Fill the in-memory catalog structures before the first request.
+    Called from config/wsgi.py when WARM_UP_ON_START is on.
+    """
+    if not getattr(settings, 'WARM_UP_ON_START', True):
+        return
+
+    from .autocomplete import autocomplete
+    from .catalog_cache import catalog_cache
+
+    try:
+        autocomplete.warm()
+        catalog_cache.warm()
+    except sqlite3.Error as e:
+        # e.g. migrations not applied yet; everything still loads lazily
+        logger.warning("Skipping warm-up: %s", e)
+    finally:
+        # With a preloading server this runs before workers fork, and SQLite
+        # connections must not be shared across processes
+        close_all_pools()
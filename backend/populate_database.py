@@ -4,6 +4,8 @@ Script to populate the database with PC components and compatibility rules
 """
 import os
 import sys
+import argparse
+import time
 import django
 import json
 
@@ -11,13 +13,11 @@ import json
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 django.setup()
 
-from pcbuilder.database import (
-    CategoryDB, VendorDB, ComponentDB, DatabaseManager
-)
+from pcbuilder.catalog_loader import CatalogLoader
+from pcbuilder.database import CategoryDB, DatabaseManager
 
-def create_categories():
+def create_categories(loader):
     """Create component categories"""
-    category_db = CategoryDB()
     
     categories = [
         {'name': 'CPU', 'slug': 'cpu', 'icon': 'fas fa-microchip'},
@@ -30,22 +30,10 @@ def create_categories():
         {'name': 'CPU Cooler', 'slug': 'cooler', 'icon': 'fas fa-fan'},
     ]
     
-    for cat_data in categories:
-        # Check if category exists
-        existing = category_db.get_all_categories()
-        if not any(cat['slug'] == cat_data['slug'] for cat in existing):
-            print(f"Creating category: {cat_data['name']}")
-            # We'll need to add create_category method to CategoryDB
-            # For now, we'll use direct SQL
-            db = DatabaseManager()
-            db.execute_insert(
-                "INSERT INTO pcbuilder_category (name, slug, icon) VALUES (?, ?, ?)",
-                (cat_data['name'], cat_data['slug'], cat_data['icon'])
-            )
+    print(f"Created {loader.load_categories(categories)} categories")
 
-def create_vendors():
+def create_vendors(loader):
     """Create vendor companies"""
-    vendor_db = VendorDB()
     
     vendors = [
         {'name': 'Intel', 'website': 'https://www.intel.com', 'logo': 'https://logo.clearbit.com/intel.com'},
@@ -68,38 +56,10 @@ def create_vendors():
         {'name': 'Cooler Master', 'website': 'https://www.coolermaster.com', 'logo': 'https://logo.clearbit.com/coolermaster.com'},
     ]
     
-    for vendor_data in vendors:
-        existing = vendor_db.get_all_vendors()
-        if not any(v['name'] == vendor_data['name'] for v in existing):
-            print(f"Creating vendor: {vendor_data['name']}")
-            db = DatabaseManager()
-            db.execute_insert(
-                "INSERT INTO pcbuilder_vendor (name, website, logo) VALUES (?, ?, ?)",
-                (vendor_data['name'], vendor_data['website'], vendor_data['logo'])
-            )
-
-def get_category_id(slug):
-    """Get category ID by slug"""
-    category_db = CategoryDB()
-    categories = category_db.get_all_categories()
-    for cat in categories:
-        if cat['slug'] == slug:
-            return cat['id']
-    return None
+    print(f"Created {loader.load_vendors(vendors)} vendors")
 
-def get_vendor_id(name):
-    """Get vendor ID by name"""
-    vendor_db = VendorDB()
-    vendors = vendor_db.get_all_vendors()
-    for vendor in vendors:
-        if vendor['name'] == name:
-            return vendor['id']
-    return None
-
-def create_components():
-    """Create sample components"""
-    component_db = ComponentDB()
-    db = DatabaseManager()
+def sample_components():
+    """The sample components"""
     
     # CPUs
     cpus = [
@@ -532,25 +492,27 @@ def create_components():
         }
     ]
     
-    all_components = cpus + motherboards + gpus + psus + cases + coolers + ram_modules + storage_devices
+    return cpus + motherboards + gpus + psus + cases + coolers + ram_modules + storage_devices
+
+def synthetic_components(count):
+    """Generate `count` variants of the sample components, for load testing"""
+    samples = sample_components()
+    for i in range(count):
+        comp = dict(samples[i % len(samples)])
+        comp['name'] = f"{comp['name']} #{i // len(samples) + 1}"
+        yield comp
+
+def create_components(loader, synthetic=0):
+    """Create sample components, plus `synthetic` generated ones"""
+    records = sample_components()
+    if synthetic:
+        records = synthetic_components(synthetic)
     
-    for comp in all_components:
-        category_id = get_category_id(comp['category_slug'])
-        vendor_id = get_vendor_id(comp['vendor_name'])
-        
-        if category_id and vendor_id:
-            # Check if component already exists
-            existing = component_db.get_all_components()
-            if not any(c['name'] == comp['name'] for c in existing):
-                print(f"Creating component: {comp['name']}")
-                db.execute_insert(
-                    """INSERT INTO pcbuilder_component 
-                       (name, description, price, category_id, vendor_id, image, specs, stock) 
-                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                    (comp['name'], comp['description'], comp['price'], 
-                     category_id, vendor_id, comp['image'], 
-                     json.dumps(comp['specs']), 100)
-                )
+    started = time.monotonic()
+    stats = loader.load_components(records)
+    elapsed = time.monotonic() - started
+    print(f"Loaded {stats['records']} components in {elapsed:.2f}s "
+          f"({stats['written']} inserted or changed, {stats['skipped']} with unknown category or vendor)")
 
 def create_compatibility_rules():
     """Create compatibility rules between components"""
@@ -635,17 +597,24 @@ def create_compatibility_rules():
                     (source_id, target_id, json.dumps(rule['condition']))
                 )
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help='load N generated components instead of the samples')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args(argv)
+    loader = CatalogLoader(batch_size=args.batch_size)
+    
     print("Populating database with PC components...")
     
     print("\n1. Creating categories...")
-    create_categories()
+    create_categories(loader)
     
     print("\n2. Creating vendors...")
-    create_vendors()
+    create_vendors(loader)
     
     print("\n3. Creating components...")
-    create_components()
+    create_components(loader, args.synthetic)
     
     print("\n4. Creating compatibility rules...")
     create_compatibility_rules()
@@ -112,24 +112,8 @@ const PCBuilder: React.FC = () => {
 
   const checkBuildCompatibility = async (components: Component[]) => {
     try {
-      // Create a temporary build to check compatibility
-      const tempBuild = await buildAPI.create({
-        name: 'Temp Build',
-        description: 'Temporary build for compatibility check',
-        is_public: false
-      });
-
-      // Add components to the build
-      for (const component of components) {
-        await buildAPI.addComponent(tempBuild.id, component.id);
-      }
-
-      // Check compatibility
-      const compatibility = await compatibilityAPI.checkBuild(tempBuild.id);
-
-      // Clean up temporary build
-      await buildAPI.delete(tempBuild.id);
-
+      // Checked without saving a build, so it also works before logging in
+      const compatibility = await compatibilityAPI.checkParts(components.map(component => component.id));
       setBuildCompatibility(compatibility);
     } catch (error) {
       // Handle compatibility check error silently
@@ -179,11 +163,10 @@ const PCBuilder: React.FC = () => {
       });
 
       // Add components to the build
-      for (const slot of selectedComponents) {
-        if (slot.component) {
-          await buildAPI.addComponent(build.id, slot.component.id);
-        }
-      }
+      await buildAPI.applyChanges(
+        build.id,
+        selectedComponents.map(slot => ({ op: 'add' as const, component_id: slot.component!.id }))
+      );
 
       alert('Build saved successfully!');
     } catch (error) {
@@ -4,19 +4,34 @@ import type {
   Category,
   Vendor,
   Build,
+  BuildComponentOperation,
+  BulkBuildResult,
   CompatibilityResult,
   BuildCompatibilityResult,
+  CandidateCompatibilityResult,
   AuthResponse,
   LoginRequest,
   RegisterRequest,
-  User
+  User,
+  Paginated
 } from '../types';
 
+// Follow the cursor links of a paginated list endpoint and collect every page
+const fetchAllPages = async <T>(url: string): Promise<T[]> => {
+  const results: T[] = [];
+  let next: string | null = url;
+  while (next) {
+    const response: { data: Paginated<T> } = await axios.get(next);
+    results.push(...response.data.results);
+    next = response.data.next;
+  }
+  return results;
+};
+
 // Component API
 export const componentAPI = {
   getAll: async (): Promise<Component[]> => {
-    const response = await axios.get('/api/v1/components/');
-    return response.data;
+    return fetchAllPages<Component>('/api/v1/components/?page_size=100');
   },
 
   getById: async (id: number): Promise<Component> => {
@@ -25,8 +40,7 @@ export const componentAPI = {
   },
 
   getByCategory: async (categorySlug: string): Promise<Component[]> => {
-    const response = await axios.get(`/api/v1/components/?category=${categorySlug}`);
-    return response.data;
+    return fetchAllPages<Component>(`/api/v1/components/?category=${categorySlug}&page_size=100`);
   }
 };
 
@@ -92,14 +106,27 @@ export const buildAPI = {
 
   removeComponent: async (buildId: number, componentId: number): Promise<void> => {
     await axios.delete(`/api/v1/builds/${buildId}/components/${componentId}/`);
+  },
+
+  // Apply many component changes in one request and one transaction.
+  // Nothing is applied if any operation fails.
+  applyChanges: async (
+    buildId: number,
+    operations: BuildComponentOperation[],
+    compatibility = false
+  ): Promise<BulkBuildResult> => {
+    const response = await axios.patch(`/api/v1/builds/${buildId}/components/`, {
+      operations,
+      compatibility
+    });
+    return response.data;
   }
 };
 
 // Public Builds API
 export const publicBuildAPI = {
   getAll: async (): Promise<Build[]> => {
-    const response = await axios.get('/api/v1/public-builds/');
-    return response.data;
+    return fetchAllPages<Build>('/api/v1/public-builds/?page_size=100');
   },
 
   getById: async (id: number): Promise<Build> => {
@@ -123,6 +150,33 @@ export const compatibilityAPI = {
     return response.data;
   },
 
+  // Check parts that are not saved as a build yet
+  checkParts: async (componentIds: number[]): Promise<BuildCompatibilityResult> => {
+    const response = await axios.post('/api/v1/compatibility/', {
+      component_ids: componentIds
+    });
+    return response.data;
+  },
+
+  // Check many candidates against the current parts in one request.
+  // Pass a category slug to check the whole category, or explicit candidate ids.
+  // A category comes back a page at a time, so follow the next links.
+  checkCandidates: async (
+    componentIds: number[],
+    candidates: { category: string } | { candidate_ids: number[] }
+  ): Promise<CandidateCompatibilityResult[]> => {
+    const body = { component_ids: componentIds, ...candidates };
+    const results: CandidateCompatibilityResult[] = [];
+    let next: string | null = '/api/v1/compatibility/candidates/?page_size=100';
+    while (next) {
+      const response: { data: { next: string | null; candidates: CandidateCompatibilityResult[] } } =
+        await axios.post(next, body);
+      results.push(...response.data.candidates);
+      next = response.data.next;
+    }
+    return results;
+  },
+
   // Temporary build methods for compatibility checking
   createTempBuild: async (data: { name: string; description?: string; is_public?: boolean }): Promise<Build> => {
     const response = await axios.post('/api/v1/builds/', data);
@@ -172,8 +226,7 @@ export const authAPI = {
 // User API
 export const userAPI = {
   getAll: async (): Promise<User[]> => {
-    const response = await axios.get('/api/v1/users/');
-    return response.data;
+    return fetchAllPages<User>('/api/v1/users/?page_size=100');
   },
 
   getById: async (id: number): Promise<User> => {
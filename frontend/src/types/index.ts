@@ -58,6 +58,11 @@ export interface BuildComponent {
   vendor_website?: string;
 }
 
+export type BuildComponentOperation =
+  | { op: 'add'; component_id: number; quantity?: number; notes?: string }
+  | { op: 'remove'; component_id: number }
+  | { op: 'quantity'; component_id: number; quantity: number };
+
 export interface CompatibilityResult {
   compatible: boolean;
   status: 'green' | 'red' | 'yellow';
@@ -82,6 +87,23 @@ export interface BuildCompatibilityResult {
   }>;
 }
 
+export interface BulkBuildResult extends Build {
+  compatibility?: BuildCompatibilityResult;
+}
+
+export interface CandidateCompatibilityResult {
+  component_id: number;
+  compatible: boolean;
+  status: 'green' | 'red' | 'yellow';
+  messages: Array<{
+    component_id: number;
+    component: string;
+    status: 'green' | 'red' | 'yellow';
+    message: string;
+    rule: string;
+  }>;
+}
+
 export interface User {
   id: number;
   username: string;
@@ -95,6 +117,12 @@ export interface User {
   date_joined: string;
 }
 
+export interface Paginated<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
 export interface AuthResponse {
   refresh: string;
   access: string;